@@ -0,0 +1,59 @@
+import pandas as pd
+
+
+def find_overlapping_loans(df: pd.DataFrame, key: str = "book_title") -> pd.DataFrame:
+    """Return loans that start while another loan of the same title is still out.
+
+    The export has no copy identifier (Id is a loan record number), so loans
+    are grouped by ``key``: the title by default, compared case-insensitively.
+    A title the library holds several copies of can legitimately be out twice
+    at once, so a flagged loan is one to check, not proof of a bad record.
+    Loans are sorted by title and checkout date and swept once per title,
+    tracking the latest return date seen so far, so the whole check is
+    O(n log n).
+
+    Loans with no return date are still out. Loans with no checkout date, or
+    returned before checkout, are already invalid and are not swept. Each
+    flagged row carries the id of the loan it collides with and the number of
+    days the two overlap. Handing a book back and lending it out again on the
+    same day is not an overlap.
+    """
+    checkout = pd.to_datetime(df["checkout_date"])
+    returned = pd.to_datetime(df["return_date"])
+    title_key = df[key].astype("string").str.strip().str.casefold()
+
+    # Integer codes sort and group far faster than the strings themselves
+    codes = pd.Series(pd.factorize(title_key)[0], index=df.index)
+
+    valid = title_key.notna() & checkout.notna() & (returned.isna() | (returned >= checkout))
+    loans = pd.DataFrame({
+        "row": df.index[valid.to_numpy()],
+        "title": codes[valid],
+        "id": df.loc[valid, "id"],
+        "start": checkout[valid],
+        "end": returned[valid].fillna(pd.Timestamp.max),
+    })
+
+    loans = loans.sort_values(["title", "start"], kind="mergesort").reset_index(drop=True)
+    groups = loans.groupby("title", sort=False)
+
+    # Latest return among the earlier loans of the same title, and whose loan that is
+    running_end = groups["end"].cummax()
+    holder = loans["id"].where(loans["end"] == running_end)
+    holder = holder.groupby(loans["title"], sort=False).ffill()
+    previous_end = running_end.groupby(loans["title"], sort=False).shift()
+    previous_holder = holder.groupby(loans["title"], sort=False).shift()
+
+    overlapping = previous_end.notna() & (loans["start"] < previous_end)
+    hits = loans[overlapping]
+
+    flagged = df.loc[hits["row"]].copy()
+    flagged["overlaps_with_id"] = previous_holder[overlapping].to_numpy()
+    overlap_end = previous_end[overlapping].where(
+        previous_end[overlapping] < hits["end"], hits["end"]
+    )
+    flagged["overlap_days"] = (
+        overlap_end.where(overlap_end != pd.Timestamp.max).to_numpy() - hits["start"].to_numpy()
+    ) / pd.Timedelta(days=1)
+
+    return flagged
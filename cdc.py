@@ -0,0 +1,102 @@
+import os
+
+import pandas as pd
+
+CHANGE_COLUMN = "_change"
+
+
+def row_hashes(df: pd.DataFrame, key: str) -> pd.Series:
+    """64-bit hash of every row, indexed by primary key (as text)."""
+    keys = df[key].astype("string")
+    if keys.isna().any():
+        raise ValueError(f"{key} has missing values; cannot track changes by it")
+    if keys.duplicated().any():
+        raise ValueError(f"{key} is not unique; cannot track changes by it")
+
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return pd.Series(hashes.to_numpy(), index=pd.Index(keys.to_numpy(), name=key), name="row_hash")
+
+
+def read_manifest(manifest_path: str, key: str) -> pd.Series:
+    if not os.path.exists(manifest_path):
+        return pd.Series([], index=pd.Index([], name=key, dtype="object"), dtype="uint64", name="row_hash")
+
+    manifest = pd.read_csv(manifest_path, dtype={key: "string", "row_hash": "string"})
+    hashes = manifest["row_hash"].map(lambda value: int(value, 16)).astype("uint64")
+    return pd.Series(hashes.to_numpy(), index=pd.Index(manifest[key].to_numpy(), name=key), name="row_hash")
+
+
+def write_manifest(hashes: pd.Series, manifest_path: str):
+    manifest = pd.DataFrame({
+        hashes.index.name: hashes.index,
+        "row_hash": [f"{value:016x}" for value in hashes.to_numpy()],
+    })
+    tmp_path = manifest_path + ".tmp"
+    manifest.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def split_untrackable(df: pd.DataFrame, key: str):
+    """Split off rows whose key is missing or shared by several rows.
+
+    Those rows cannot be matched to last run's manifest, but they are expected
+    input (missing customer IDs are a data-quality metric), so they are set
+    aside rather than stopping the run.
+    """
+    keys = df[key].astype("string")
+    bad = keys.isna() | keys.duplicated(keep=False)
+    return df[~bad], df[bad]
+
+
+def capture_changes(df: pd.DataFrame, key: str, manifest_path: str, delta_path: str,
+                    quarantine_path: str = None) -> dict:
+    """Write only the rows that changed since the previous run.
+
+    Each row is hashed by primary key and compared with the last run's
+    manifest (key + hash only, so it stays small). Inserts and updates are
+    written in full; deletes carry just the key. The delta column ``_change``
+    says which is which. The first run, with no manifest yet, is all inserts.
+
+    Rows with a missing or duplicated key are left out of the delta, counted
+    as ``quarantined`` and, if ``quarantine_path`` is given, written there.
+    A duplicated key keeps its previous manifest entry rather than counting
+    as a delete.
+    """
+    df, quarantined = split_untrackable(df, key)
+    current = row_hashes(df, key)
+    previous = read_manifest(manifest_path, key)
+
+    keys = current.index
+    in_previous = keys.isin(previous.index)
+    inserted = ~in_previous
+    updated = in_previous.copy()
+    updated[in_previous] = current.to_numpy()[in_previous] != previous.loc[keys[in_previous]].to_numpy()
+
+    held = previous.index.isin(quarantined[key].dropna().astype("string"))
+    deleted_keys = previous.index[~previous.index.isin(keys) & ~held]
+
+    changed = df[inserted | updated].copy()
+    changed[CHANGE_COLUMN] = pd.Series(inserted, index=df.index)[inserted | updated].map(
+        {True: "insert", False: "update"}
+    )
+    deletes = pd.DataFrame({key: deleted_keys, CHANGE_COLUMN: "delete"})
+    delta = pd.concat([changed, deletes], ignore_index=True) if len(deletes) else changed
+
+    if quarantine_path is not None:
+        tmp_path = quarantine_path + ".tmp"
+        quarantined.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, quarantine_path)
+
+    # Delta first, then manifest: a crash in between just replays the same delta
+    tmp_path = delta_path + ".tmp"
+    delta.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, delta_path)
+    write_manifest(pd.concat([current, previous[held]]), manifest_path)
+
+    return {
+        "inserts": int(inserted.sum()),
+        "updates": int(updated.sum()),
+        "deletes": int(len(deleted_keys)),
+        "unchanged": int(len(df) - inserted.sum() - updated.sum()),
+        "quarantined": int(len(quarantined)),
+    }
@@ -0,0 +1,198 @@
+import io
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from compressed_io import open_decompressed
+from metrics import BOOK_COLUMNS, BOOK_DATE_COLUMNS, clean_book_rows, guess_book_date_formats, summarise_books
+
+MANIFEST_FILE = "manifest.json"
+RAW_HASH = "_raw_hash"
+ID_COLUMNS = ["Id", "Customer ID"]
+
+# Text columns are read as text in every chunk, whatever a chunk happens to hold
+BOOK_TEXT_DTYPES = {
+    "Books": "object",
+    "Book checkout": "object",
+    "Book Returned": "object",
+    "Days allowed to borrow": "object",
+}
+
+
+def _source_signature(file_path: str, chunksize: int) -> dict:
+    stat = os.stat(file_path)
+    return {
+        "source": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "chunksize": chunksize,
+    }
+
+
+def _atomic_write_json(data: dict, path: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _load_manifest(work_dir: str, signature: dict) -> dict:
+    path = os.path.join(work_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get("signature") == signature:
+            return manifest
+
+    # New or changed input: whatever is in the work dir belongs to another run
+    clear_checkpoints(work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+    return {"signature": signature, "chunks": [], "date_formats": {}}
+
+
+def clear_checkpoints(work_dir: str):
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _read_line_blocks(stream, chunksize: int, offset: int = None):
+    """Yield (csv_bytes, end_offset) for each block of ``chunksize`` lines.
+
+    Offsets are byte positions in the decompressed stream, so a resumed run
+    seeks straight past the committed part, empty lines included. Assumes
+    one record per line (no quoted line breaks), which holds for the exports.
+    """
+    header = stream.readline()
+    if offset is None:
+        offset = len(header)
+    else:
+        stream.seek(offset)
+
+    while True:
+        lines = []
+        for _ in range(chunksize):
+            line = stream.readline()
+            if not line:
+                break
+            lines.append(line)
+        if not lines:
+            return
+        offset += sum(len(line) for line in lines)
+        yield header + b"".join(lines), offset
+
+
+def _settle_date_formats(known: dict, chunk: pd.DataFrame) -> dict:
+    """Date formats for the whole file, from the first chunk with a real date in each column.
+
+    They go into the manifest, so a resumed run keeps parsing the way one
+    whole-file read would, whatever date its next chunk starts with.
+    """
+    if all(known.get(col) for col in BOOK_DATE_COLUMNS):
+        return known
+    guessed = guess_book_date_formats(chunk.rename(columns=BOOK_COLUMNS))
+    return {col: known.get(col) or guessed[col] for col in BOOK_DATE_COLUMNS}
+
+
+def _clean_chunk(chunk: pd.DataFrame, date_formats: dict):
+    rows_loaded = len(chunk)
+
+    # Blank rows (all columns empty)
+    blank_rows = chunk.isna().all(axis=1).sum()
+    chunk = chunk.dropna(how="all")
+
+    # ID columns read as int in a chunk without blanks and as float in one
+    # with them; remember which, so the text can match a whole-file read
+    id_kinds = {col: chunk[col].dtype.kind for col in ID_COLUMNS if rows_loaded}
+
+    chunk = chunk.rename(columns=BOOK_COLUMNS)
+
+    # Duplicates are judged on the raw values, before cleaning, exactly as in
+    # load_and_clean_books; keep a hash of them for the final cross-chunk pass.
+    # Hash IDs as float so 1 and 1.0 from different chunks still collide.
+    hashed = chunk.astype({BOOK_COLUMNS[col]: "float64" for col, kind in id_kinds.items() if kind == "i"})
+    chunk[RAW_HASH] = pd.util.hash_pandas_object(hashed, index=False)
+
+    return clean_book_rows(chunk, date_formats=date_formats), int(rows_loaded), int(blank_rows), id_kinds
+
+
+def _match_whole_file_ids(frames: list, chunks: list) -> list:
+    """Format cleaned IDs the way one read_csv of the whole file would.
+
+    That read makes an ID column float as soon as any row has it blank
+    ("1.0" after cleaning), and keeps it int only when none do ("1").
+    """
+    for col in ID_COLUMNS:
+        kinds = {chunk["id_kinds"][col] for chunk in chunks if col in chunk["id_kinds"]}
+        if kinds != {"i", "f"}:
+            continue
+        name = BOOK_COLUMNS[col]
+        for frame, chunk in zip(frames, chunks):
+            if chunk["id_kinds"].get(col) == "i":
+                frame[name] = pd.to_numeric(frame[name]).astype("float64").astype("string")
+    return frames
+
+
+def load_and_clean_books_resumable(file_path: str, work_dir: str = "work/books", chunksize: int = 100_000,
+                                   return_overlaps: bool = False):
+    """Chunked load_and_clean_books that can pick up where a failed run stopped.
+
+    Each cleaned chunk is committed to ``work_dir`` (temp file + rename) along
+    with its row counts and end byte offset in a manifest, which also keeps
+    the file's date formats. A rerun on the same
+    input seeks past the chunks already committed. Duplicates are then removed
+    across all chunks and the metrics computed once over the result, so they
+    match an uninterrupted run. Call clear_checkpoints once the outputs are
+    safely written.
+    """
+    print("\n--- Cleaning BOOKS dataset (resumable) ---")
+
+    signature = _source_signature(file_path, chunksize)
+    manifest = _load_manifest(work_dir, signature)
+    done_rows = sum(chunk["rows_loaded"] for chunk in manifest["chunks"])
+    offset = manifest["chunks"][-1]["end_offset"] if manifest["chunks"] else None
+
+    if manifest["chunks"]:
+        print(f"Resuming after {len(manifest['chunks'])} committed chunks ({done_rows} rows)")
+
+    if not manifest.get("complete"):
+        # Skip the committed prefix of the file instead of parsing it again
+        with open_decompressed(file_path) as stream:
+            for block, end_offset in _read_line_blocks(stream, chunksize, offset):
+                chunk = pd.read_csv(io.BytesIO(block), dtype=BOOK_TEXT_DTYPES)
+                date_formats = _settle_date_formats(manifest.get("date_formats", {}), chunk)
+                cleaned, rows_loaded, blank_rows, id_kinds = _clean_chunk(chunk, date_formats)
+
+                index = len(manifest["chunks"])
+                chunk_file = f"chunk-{index:05d}.pkl"
+                chunk_path = os.path.join(work_dir, chunk_file)
+                cleaned.to_pickle(chunk_path + ".tmp")
+                os.replace(chunk_path + ".tmp", chunk_path)
+
+                manifest["chunks"].append({
+                    "file": chunk_file,
+                    "rows_loaded": rows_loaded,
+                    "blank_rows": blank_rows,
+                    "end_offset": end_offset,
+                    "id_kinds": id_kinds,
+                })
+                manifest["date_formats"] = date_formats
+                _atomic_write_json(manifest, os.path.join(work_dir, MANIFEST_FILE))
+
+        manifest["complete"] = True
+        _atomic_write_json(manifest, os.path.join(work_dir, MANIFEST_FILE))
+
+    frames = [pd.read_pickle(os.path.join(work_dir, chunk["file"])) for chunk in manifest["chunks"]]
+    df = pd.concat(_match_whole_file_ids(frames, manifest["chunks"]), ignore_index=True)
+
+    rows_loaded = sum(chunk["rows_loaded"] for chunk in manifest["chunks"])
+    blank_rows = sum(chunk["blank_rows"] for chunk in manifest["chunks"])
+
+    # Duplicate rows, now across chunk boundaries too
+    duplicated = df[RAW_HASH].duplicated()
+    duplicate_rows = int(duplicated.sum())
+    df = df[~duplicated].drop(columns=RAW_HASH).reset_index(drop=True)
+
+    return summarise_books(df, rows_loaded, blank_rows, duplicate_rows, return_overlaps)
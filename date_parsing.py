@@ -0,0 +1,106 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+
+# Strings to_datetime passes over when it picks the value to guess a format from
+NOT_DATES = {"", "now", "today", "NaT", "nat", "NAT", "NaN", "nan", "NAN"}
+
+
+def guess_column_format(texts, dayfirst: bool = True):
+    """The format pd.to_datetime would settle on for a column holding ``texts``.
+
+    Like to_datetime, guess from the first real value. "mixed" means no
+    format fits it and every value is parsed on its own; None means there is
+    no real value to guess from.
+    """
+    for text in texts:
+        if isinstance(text, str) and text not in NOT_DATES:
+            return guess_datetime_format(text, dayfirst=dayfirst) or "mixed"
+    return None
+
+
+class DateCache:
+    """Text -> parsed date lookup, shared by every date column, chunk and run.
+
+    Loan exports repeat a small set of calendar days many times over, so each
+    distinct string is parsed once and every row is filled in by lookup.
+    Each column is parsed in one format, guessed from its first value as
+    to_datetime does, and results are kept per format: the same text can
+    mean another day, or no day at all, under another format.
+    Strings that do not parse are remembered as NaT for the rest of the run,
+    so invalid dates are still counted exactly as before, but they are not
+    saved: a failure only says the text did not fit a guessed format.
+    """
+
+    def __init__(self, dayfirst: bool = True):
+        self.dayfirst = dayfirst
+        self._dates = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._dates)
+
+    def _parse_new(self, texts: list, date_format: str):
+        parsed = pd.to_datetime(
+            pd.Index(texts, dtype="object"),
+            errors="coerce",
+            dayfirst=self.dayfirst,
+            format=date_format or "mixed",
+        )
+        with self._lock:
+            self._dates.update(zip([(date_format, text) for text in texts], parsed.asi8))
+
+    def parse(self, values: pd.Series, date_format: str = None) -> pd.Series:
+        """Parse a column of date strings, like pd.to_datetime(values, errors="coerce").
+
+        The format is guessed from ``values`` unless given. When ``values`` is
+        only a slice of a column (a chunk or a shard), pass the whole column's
+        format from guess_column_format, so every slice parses alike.
+        """
+        codes, uniques = pd.factorize(values)
+        uniques = list(uniques)
+        if date_format is None:
+            date_format = guess_column_format(uniques, self.dayfirst)
+
+        new = [text for text in uniques if (date_format, text) not in self._dates]
+        if new:
+            self._parse_new(new, date_format)
+
+        # Map each distinct string to its date, then fan out by code; -1 is a missing value
+        lookup = np.array([self._dates[date_format, text] for text in uniques] + [pd.NaT.value], dtype="int64")
+        parsed = lookup[codes].view("datetime64[ns]")
+        return pd.Series(parsed, index=values.index, name=values.name)
+
+    def load(self, path: str):
+        if not os.path.exists(path):
+            return self
+        cached = pd.read_csv(path, dtype="string", keep_default_na=False)
+        if "format" not in cached.columns:
+            # Written before formats were recorded; its NaTs cannot be trusted
+            return self
+        dates = pd.to_datetime(cached["date"], format="ISO8601")
+        formats = cached["format"].replace("", None)
+        with self._lock:
+            self._dates.update(zip(zip(formats, cached["text"]), dates.to_numpy(dtype="datetime64[ns]").view("int64")))
+        return self
+
+    def save(self, path: str):
+        with self._lock:
+            items = [(key, value) for key, value in self._dates.items() if value != pd.NaT.value]
+        dates = pd.Series([value for _, value in items], dtype="int64").to_numpy().view("datetime64[ns]")
+        cached = pd.DataFrame({
+            "format": [date_format for (date_format, _), _ in items],
+            "text": [text for (_, text), _ in items],
+            "date": dates,
+        })
+        tmp_path = path + ".tmp"
+        cached.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+# One cache per process, so chunked and repeated cleaning share it
+DATE_CACHE = DateCache(dayfirst=True)
@@ -1,10 +1,14 @@
 import pandas as pd
 
+from compressed_io import read_raw_csv
+from csv_writer import write_csv_atomic
+from scheduler import Stage, print_timing_report, run_pipeline
+
 
 def load_and_clean_books(file_path: str) -> pd.DataFrame:
     print("\n--- Cleaning BOOKS dataset ---")
 
-    df = pd.read_csv(file_path)
+    df = read_raw_csv(file_path)
     rows_loaded = len(df)
 
     # Blank rows (all columns empty)
@@ -68,7 +72,7 @@ def load_and_clean_books(file_path: str) -> pd.DataFrame:
 def load_and_clean_customers(file_path: str) -> pd.DataFrame:
     print("\n--- Cleaning CUSTOMERS dataset ---")
 
-    df = pd.read_csv(file_path)
+    df = read_raw_csv(file_path)
     rows_loaded = len(df)
 
     blank_rows = df.isna().all(axis=1).sum()
@@ -93,12 +97,22 @@ def load_and_clean_customers(file_path: str) -> pd.DataFrame:
     return df
 
 if __name__ == "__main__":
-    file_path = "03_Library Systembook.csv"
-    customers_file = "03_Library SystemCustomers.csv"
-    cleaned_customers = load_and_clean_customers(customers_file)
-    cleaned_customers.to_csv("clean_library_customers.csv", index=False)
-
-    cleaned_books = load_and_clean_books(file_path)
-    cleaned_books.to_csv("clean_library_books.csv", index=False)
+    # The two datasets are independent, so clean and save them side by side
+    stages = [
+        Stage("clean_customers", load_and_clean_customers, inputs=["customers_file"], outputs=["cleaned_customers"]),
+        Stage("clean_books", load_and_clean_books, inputs=["books_file"], outputs=["cleaned_books"]),
+        Stage("write_customers", lambda df: write_csv_atomic(df, "clean_library_customers.csv"),
+              inputs=["cleaned_customers"]),
+        Stage("write_books", lambda df: write_csv_atomic(df, "clean_library_books.csv"),
+              inputs=["cleaned_books"]),
+    ]
+    _, timings = run_pipeline(
+        stages,
+        initial={
+            "books_file": "03_Library Systembook.csv",
+            "customers_file": "03_Library SystemCustomers.csv",
+        },
+    )
 
     print("\nSaved: clean_library_books.csv")
+    print_timing_report(stages, timings)
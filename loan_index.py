@@ -0,0 +1,163 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# Loans that were never returned stay open until the end of time
+OPEN_END = np.iinfo("int64").max
+
+
+def _to_ns(value) -> int:
+    return pd.Timestamp(value).value
+
+
+def _title_key(title) -> str:
+    return str(title).strip().casefold()
+
+
+class _IntervalTree:
+    """Centred interval tree over closed [start, end] intervals (int64 nanoseconds).
+
+    Point and range queries cost O(log n + k) for k matches.
+    """
+
+    def __init__(self, starts, ends, positions):
+        self.center = None
+        self.left = None
+        self.right = None
+        if len(positions) == 0:
+            return
+
+        # Median endpoint keeps the tree balanced; open ends are capped so
+        # they do not drag the centre off to infinity
+        endpoints = np.sort(np.concatenate([starts, np.minimum(ends, starts.max())]))
+        self.center = int(endpoints[len(endpoints) // 2])
+
+        go_left = ends < self.center
+        go_right = starts > self.center
+        here = ~(go_left | go_right)
+
+        # Intervals crossing the centre, sorted both ways for early exits
+        by_start = np.argsort(starts[here], kind="stable")
+        by_end = np.argsort(-ends[here], kind="stable")
+        self.starts_asc = starts[here][by_start]
+        self.pos_by_start = positions[here][by_start]
+        self.ends_desc = ends[here][by_end]
+        self.pos_by_end = positions[here][by_end]
+
+        if go_left.any():
+            self.left = _IntervalTree(starts[go_left], ends[go_left], positions[go_left])
+        if go_right.any():
+            self.right = _IntervalTree(starts[go_right], ends[go_right], positions[go_right])
+
+    def query_range(self, lo: int, hi: int, out: list):
+        node = self
+        while node is not None and node.center is not None:
+            if hi < node.center:
+                # Every interval here ends after hi, so only the start matters
+                count = np.searchsorted(node.starts_asc, hi, side="right")
+                out.extend(node.pos_by_start[:count])
+                node = node.left
+            elif lo > node.center:
+                # Every interval here starts before lo, so only the end matters
+                count = np.searchsorted(-node.ends_desc, -lo, side="right")
+                out.extend(node.pos_by_end[:count])
+                node = node.right
+            else:
+                out.extend(node.pos_by_start)
+                if node.left is not None:
+                    node.left.query_range(lo, hi, out)
+                node = node.right
+        return out
+
+
+class LoanIntervalIndex:
+    """Interval index over cleaned loans, from checkout_date to return_date.
+
+    Build it once after cleaning and reuse it for "which loans were active on D"
+    and "who held title T on D" questions. Loans with no return date are treated
+    as still open. Loans with no checkout date, or returned before they were
+    checked out, are not real intervals and are left out.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        checkout = pd.to_datetime(df["checkout_date"])
+        returned = pd.to_datetime(df["return_date"])
+
+        valid = checkout.notna() & (returned.isna() | (returned >= checkout))
+        self.loans = df[valid.to_numpy()].reset_index(drop=True)
+        self.excluded = int((~valid).sum())
+
+        starts = checkout[valid].to_numpy(dtype="datetime64[ns]").astype("int64")
+        ends = returned[valid].to_numpy(dtype="datetime64[ns]").astype("int64")
+        ends = np.where(returned[valid].isna().to_numpy(), OPEN_END, ends)
+        positions = np.arange(len(starts))
+
+        self._starts = starts
+        self._ends = ends
+        self._tree = _IntervalTree(starts, ends, positions)
+
+        # Sorted endpoints answer counts with two binary searches
+        self._sorted_starts = np.sort(starts)
+        self._sorted_ends = np.sort(ends)
+
+        # One small tree per title for holder lookups
+        self._title_trees = {}
+        titles = self.loans["book_title"].map(_title_key, na_action="ignore")
+        for title, group in titles.groupby(titles, sort=False).groups.items():
+            pos = np.asarray(group)
+            self._title_trees[title] = _IntervalTree(starts[pos], ends[pos], pos)
+
+    def __len__(self):
+        return len(self.loans)
+
+    def _rows(self, positions) -> pd.DataFrame:
+        return self.loans.iloc[np.sort(np.asarray(positions, dtype="int64"))]
+
+    def active_on(self, date) -> pd.DataFrame:
+        """Loans that were out on the given date."""
+        point = _to_ns(date)
+        return self._rows(self._tree.query_range(point, point, []))
+
+    def active_between(self, start, end) -> pd.DataFrame:
+        """Loans that were out at any point between start and end (inclusive)."""
+        return self._rows(self._tree.query_range(_to_ns(start), _to_ns(end), []))
+
+    def holders(self, title, date) -> pd.DataFrame:
+        """Loans of the given title that were out on the given date."""
+        tree = self._title_trees.get(_title_key(title))
+        if tree is None:
+            return self.loans.iloc[0:0]
+        point = _to_ns(date)
+        return self._rows(tree.query_range(point, point, []))
+
+    def count_active(self, dates) -> np.ndarray:
+        """Number of loans out on each date, one binary search pair per date."""
+        points = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]").astype("int64")
+        started = np.searchsorted(self._sorted_starts, points, side="right")
+        finished = np.searchsorted(self._sorted_ends, points, side="left")
+        return started - finished
+
+    def active_on_many(self, dates) -> dict:
+        """Loans out on each of many dates, answered in one sweep.
+
+        Dates and loans are both walked in order, keeping the open loans in a
+        heap keyed by return date, so the cost is O((n + q) log n) plus output.
+        """
+        points = pd.to_datetime(pd.Series(dates)).drop_duplicates().sort_values()
+        order = np.argsort(self._starts, kind="stable")
+
+        results = {}
+        open_loans = []
+        next_loan = 0
+        for date in points:
+            point = date.value
+            while next_loan < len(order) and self._starts[order[next_loan]] <= point:
+                pos = order[next_loan]
+                heapq.heappush(open_loans, (self._ends[pos], pos))
+                next_loan += 1
+            while open_loans and open_loans[0][0] < point:
+                heapq.heappop(open_loans)
+            results[date] = self._rows([pos for _, pos in open_loans])
+
+        return results
@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+BOOKS_FILE = "clean_library_books.csv"
+CUSTOMERS_FILE = "clean_library_customers.csv"
+
+
+def _customer_key(value) -> str:
+    # Cleaned IDs come out of pandas as "1.0"; users type "1"
+    key = str(value).strip()
+    if key.endswith(".0") and key[:-2].isdigit():
+        key = key[:-2]
+    return key
+
+
+def _title_key(value) -> str:
+    return str(value).strip().casefold()
+
+
+def _records(df: pd.DataFrame) -> list:
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+class LRUCache:
+    """Small bounded cache that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _Snapshot:
+    """One published version of the cleaned files plus its hash indexes."""
+
+    def __init__(self, books_file: str, customers_file: str):
+        self.version = (_file_version(books_file), _file_version(customers_file))
+
+        self.books = pd.read_csv(
+            books_file,
+            dtype={"id": "string", "book_title": "string", "customer_id": "string"},
+            parse_dates=["checkout_date", "return_date"],
+        )
+        self.customers = pd.read_csv(
+            customers_file, dtype={"customer_id": "string", "customer_name": "string"}
+        )
+
+        # Hash indexes: key -> row positions, built once per publish
+        self.loans_by_customer = self._positions(self.books["customer_id"].map(_customer_key, na_action="ignore"))
+        self.loans_by_title = self._positions(self.books["book_title"].map(_title_key, na_action="ignore"))
+        self.customer_names = {
+            _customer_key(cid): name
+            for cid, name in zip(self.customers["customer_id"], self.customers["customer_name"])
+            if pd.notna(cid)
+        }
+
+    @staticmethod
+    def _positions(keys: pd.Series) -> dict:
+        keys = keys.reset_index(drop=True)
+        return {key: list(pos) for key, pos in keys.groupby(keys, sort=False).indices.items()}
+
+
+def _file_version(path: str):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class LoanQueryService:
+    """In-process read API over the cleaned books and customers files.
+
+    Lookups go through hash indexes by customer ID and title, with hot results
+    kept in an LRU cache. Each query checks whether a new cleaned output has
+    been published and, if so, swaps in a fresh snapshot and drops the cache.
+    """
+
+    def __init__(self, books_file: str = BOOKS_FILE, customers_file: str = CUSTOMERS_FILE,
+                 cache_size: int = 1024, latency_window: int = 10000):
+        self.books_file = books_file
+        self.customers_file = customers_file
+        self.cache = LRUCache(cache_size)
+        self.reloads = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._reload_lock = threading.Lock()
+        self._snapshot = _Snapshot(books_file, customers_file)
+
+    def _current(self) -> _Snapshot:
+        try:
+            version = (_file_version(self.books_file), _file_version(self.customers_file))
+        except FileNotFoundError:
+            # Mid-publish; keep serving the last good snapshot
+            return self._snapshot
+
+        if version != self._snapshot.version:
+            with self._reload_lock:
+                if version != self._snapshot.version:
+                    self._snapshot = _Snapshot(self.books_file, self.customers_file)
+                    self.cache.clear()
+                    self.reloads += 1
+        return self._snapshot
+
+    def _timed(self, cache_key, compute):
+        started = time.perf_counter()
+        snapshot = self._current()
+        # Cache the serialized result, so no caller can change what others get back
+        text = self.cache.get((snapshot.version, cache_key))
+        if text is None:
+            text = json.dumps(compute(snapshot))
+            self.cache.put((snapshot.version, cache_key), text)
+        result = json.loads(text)
+        self._latencies.append(time.perf_counter() - started)
+        return result
+
+    def loans_for_customer(self, customer_id) -> dict:
+        key = _customer_key(customer_id)
+
+        def compute(snapshot):
+            positions = snapshot.loans_by_customer.get(key, [])
+            return {
+                "customer_id": key,
+                "customer_name": snapshot.customer_names.get(key),
+                "loans": _records(snapshot.books.iloc[positions]),
+            }
+
+        return self._timed(("customer", key), compute)
+
+    def loans_for_title(self, title) -> dict:
+        key = _title_key(title)
+
+        def compute(snapshot):
+            positions = snapshot.loans_by_title.get(key, [])
+            return {"title": str(title).strip(), "loans": _records(snapshot.books.iloc[positions])}
+
+        return self._timed(("title", key), compute)
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(q):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+
+        return {
+            "queries": len(latencies),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "cache_entries": len(self.cache),
+            "reloads": self.reloads,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": percentile(1.0),
+        }
+
+
+def make_handler(service: LoanQueryService):
+    class LoanRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            try:
+                if url.path == "/loans" and "customer_id" in params:
+                    self._send(200, service.loans_for_customer(params["customer_id"]))
+                elif url.path == "/loans" and "title" in params:
+                    self._send(200, service.loans_for_title(params["title"]))
+                elif url.path == "/stats":
+                    self._send(200, service.stats())
+                else:
+                    self._send(404, {"error": "use /loans?customer_id=..., /loans?title=... or /stats"})
+            except Exception as e:
+                # e.g. a newly published file that does not load; tell the client instead of hanging up
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def _send(self, status: int, body: dict):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return LoanRequestHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, service: LoanQueryService = None):
+    service = service or LoanQueryService()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Serving loan lookups on http://{host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,35 +1,54 @@
 import pandas as pd
 from datetime import datetime
 
-
-def load_and_clean_books(file_path: str):
-    print("\n--- Cleaning BOOKS dataset ---")
-
-    df = pd.read_csv(file_path)
-    rows_loaded = len(df)
-
-    # Blank rows (all columns empty)
-    blank_rows = df.isna().all(axis=1).sum()
-    df = df.dropna(how="all")
-
-    # Rename columns
-    df = df.rename(
-        columns={
-            "Id": "id",
-            "Books": "book_title",
-            "Book checkout": "checkout_date",
-            "Book Returned": "return_date",
-            "Days allowed to borrow": "time_allowed_to_borrow",
-            "Customer ID": "customer_id",
-        }
-    )
-
-    # Duplicate rows
-    duplicate_rows = df.duplicated().sum()
-    df = df.drop_duplicates().reset_index(drop=True)
+from anomalies import find_overlapping_loans
+from cdc import capture_changes
+from compressed_io import read_raw_csv
+from csv_writer import write_csv_atomic
+from date_parsing import DATE_CACHE, DateCache, guess_column_format
+from partitions import write_partitioned_books
+from scheduler import Stage, print_timing_report, run_pipeline
+from timeseries import write_daily_loan_series
+
+
+BOOK_COLUMNS = {
+    "Id": "id",
+    "Books": "book_title",
+    "Book checkout": "checkout_date",
+    "Book Returned": "return_date",
+    "Days allowed to borrow": "time_allowed_to_borrow",
+    "Customer ID": "customer_id",
+}
+
+CUSTOMER_COLUMNS = {"Customer ID": "customer_id", "Customer Name": "customer_name"}
+
+BOOK_DATE_COLUMNS = ["checkout_date", "return_date"]
+
+
+def guess_book_date_formats(df: pd.DataFrame) -> dict:
+    """The format to_datetime would pick for each date column of the whole (renamed) export.
+
+    Chunked and sharded runs clean one slice at a time; they work these out
+    once and hand them to clean_book_rows, so every slice parses alike.
+    """
+    formats = {}
+    for col in BOOK_DATE_COLUMNS:
+        # Only the first real value counts, so clean values one by one until then
+        texts = (text.replace('"', "").strip() for text in df[col] if isinstance(text, str))
+        formats[col] = guess_column_format(texts)
+    return formats
+
+
+def clean_book_rows(df: pd.DataFrame, date_cache: DateCache = None, date_formats: dict = None) -> pd.DataFrame:
+    # Row-by-row rules only, so this gives the same answer on any slice of the
+    # file, given the whole file's date formats (guess_book_date_formats)
+    if date_cache is None:
+        date_cache = DATE_CACHE
+    if date_formats is None:
+        date_formats = {}
 
     # Clean date strings (remove quotes, whitespace)
-    for col in ["checkout_date", "return_date"]:
+    for col in BOOK_DATE_COLUMNS:
         df[col] = (
             df[col]
             .astype("string")
@@ -42,10 +61,21 @@ def load_and_clean_books(file_path: str):
     df["book_title"] = df["book_title"].astype("string").str.strip()
     df["customer_id"] = df["customer_id"].astype("string").str.strip()
 
-    # Parse dates (UK format)
-    df["checkout_date"] = pd.to_datetime(df["checkout_date"], errors="coerce", dayfirst=True)
-    df["return_date"] = pd.to_datetime(df["return_date"], errors="coerce", dayfirst=True)
+    # Parse dates (UK format), each distinct string once across both columns
+    for col in BOOK_DATE_COLUMNS:
+        df[col] = date_cache.parse(df[col], date_formats.get(col))
+
+    return df
+
+
+def clean_customer_rows(df: pd.DataFrame) -> pd.DataFrame:
+    df["customer_id"] = df["customer_id"].astype("string").str.strip()
+    df["customer_name"] = df["customer_name"].astype("string").str.strip()
+    return df
+
 
+def summarise_books(df: pd.DataFrame, rows_loaded: int, blank_rows: int, duplicate_rows: int,
+                    return_overlaps: bool = False):
     # Metrics: missing / invalid
     missing_customer_ids = df["customer_id"].isna().sum()
     invalid_checkout_dates = df["checkout_date"].isna().sum()
@@ -64,6 +94,10 @@ def load_and_clean_books(file_path: str):
     returned_with_dates = df["borrowed_days"].notna().sum()
     overdue_rate = (overdue_count / returned_with_dates) if returned_with_dates > 0 else 0
 
+    # Loans that start while the same title is still out (may be another copy)
+    overlaps = find_overlapping_loans(df)
+    overlapping_loans = len(overlaps)
+
     # Print metrics
     print(f"Rows loaded: {rows_loaded}")
     print(f"Blank rows removed: {blank_rows}")
@@ -77,6 +111,7 @@ def load_and_clean_books(file_path: str):
     print(f"On time returns (<=14d): {on_time_count}")
     print(f"Overdue returns (>14d): {overdue_count}")
     print(f"Overdue rate: {overdue_rate:.2%}")
+    print(f"Overlapping loans of the same title: {overlapping_loans}")
     print(f"Rows after cleaning: {len(df)}")
 
     metrics = {
@@ -95,27 +130,52 @@ def load_and_clean_books(file_path: str):
         "on_time_returns": int(on_time_count),
         "overdue_returns": int(overdue_count),
         "overdue_rate": float(overdue_rate),
+        "overlapping_loans": int(overlapping_loans),
     }
 
+    # The flagged rows themselves, for callers that also write them out
+    if return_overlaps:
+        return df, metrics, overlaps
     return df, metrics
 
 
+def load_and_clean_books(file_path: str, return_overlaps: bool = False):
+    print("\n--- Cleaning BOOKS dataset ---")
+
+    df = read_raw_csv(file_path)
+    rows_loaded = len(df)
+
+    # Blank rows (all columns empty)
+    blank_rows = df.isna().all(axis=1).sum()
+    df = df.dropna(how="all")
+
+    # Rename columns
+    df = df.rename(columns=BOOK_COLUMNS)
+
+    # Duplicate rows
+    duplicate_rows = df.duplicated().sum()
+    df = df.drop_duplicates().reset_index(drop=True)
+
+    df = clean_book_rows(df)
+
+    return summarise_books(df, rows_loaded, blank_rows, duplicate_rows, return_overlaps)
+
+
 def load_and_clean_customers(file_path: str):
     print("\n--- Cleaning CUSTOMERS dataset ---")
 
-    df = pd.read_csv(file_path)
+    df = read_raw_csv(file_path)
     rows_loaded = len(df)
 
     blank_rows = df.isna().all(axis=1).sum()
     df = df.dropna(how="all")
 
-    df = df.rename(columns={"Customer ID": "customer_id", "Customer Name": "customer_name"})
+    df = df.rename(columns=CUSTOMER_COLUMNS)
 
     duplicate_rows = df.duplicated().sum()
     df = df.drop_duplicates().reset_index(drop=True)
 
-    df["customer_id"] = df["customer_id"].astype("string").str.strip()
-    df["customer_name"] = df["customer_name"].astype("string").str.strip()
+    df = clean_customer_rows(df)
 
     missing_customer_ids = df["customer_id"].isna().sum()
 
@@ -138,22 +198,90 @@ def load_and_clean_customers(file_path: str):
     return df, metrics
 
 
-if __name__ == "__main__":
-    books_file = "03_Library Systembook.csv"
-    customers_file = "03_Library SystemCustomers.csv"
+def write_metrics(books_metrics: dict, customers_metrics: dict, path: str = "data_quality_metrics.csv"):
+    # Save metrics as a single CSV (2 rows: books + customers)
+    metrics_df = pd.DataFrame([books_metrics, customers_metrics])
+    metrics_df.to_csv(path, index=False)
+
+
+def pipeline_stages(books_work_dir: str = None):
+    # checkpoint builds on the cleaning rules in this module
+    from checkpoint import load_and_clean_books_resumable
+
+    if books_work_dir is None:
+        def clean_books(file_path):
+            return load_and_clean_books(file_path, return_overlaps=True)
+    else:
+        # Commit cleaned chunks as we go so a failed run can resume
+        def clean_books(file_path):
+            return load_and_clean_books_resumable(file_path, books_work_dir, return_overlaps=True)
+
+    # Books and customers only meet at the metrics step, so they clean side by side
+    return [
+        Stage("clean_customers", load_and_clean_customers,
+              inputs=["customers_file"], outputs=["cleaned_customers", "customers_metrics"]),
+        Stage("clean_books", clean_books,
+              inputs=["books_file"], outputs=["cleaned_books", "books_metrics", "loan_overlaps"]),
+        Stage("write_customers", lambda df: write_csv_atomic(df, "clean_library_customers.csv"),
+              inputs=["cleaned_customers"]),
+        Stage("write_books", lambda df: write_csv_atomic(df, "clean_library_books.csv"),
+              inputs=["cleaned_books"]),
+        # Month partitions for reports that only need a date range
+        Stage("write_book_partitions", lambda df: write_partitioned_books(df, "clean_library_books"),
+              inputs=["cleaned_books"]),
+        # Row-level deltas so downstream refreshes only pick up what changed
+        Stage("books_changes",
+              lambda df: capture_changes(
+                  df, "id", "clean_library_books.manifest.csv", "clean_library_books.delta.csv",
+                  "clean_library_books.quarantine.csv",
+              ),
+              inputs=["cleaned_books"], outputs=["books_changes"]),
+        Stage("customers_changes",
+              lambda df: capture_changes(
+                  df, "customer_id", "clean_library_customers.manifest.csv", "clean_library_customers.delta.csv",
+                  "clean_library_customers.quarantine.csv",
+              ),
+              inputs=["cleaned_customers"], outputs=["customers_changes"]),
+        # Flagged rows behind the overlapping-loans metric
+        Stage("write_overlaps", lambda df: df.to_csv("loan_overlaps.csv", index=False),
+              inputs=["loan_overlaps"]),
+        # Daily outstanding / overdue trend for the dashboard
+        Stage("write_daily_series", lambda df: write_daily_loan_series(df, "loan_daily_series.csv"),
+              inputs=["cleaned_books"]),
+        Stage("write_metrics", write_metrics, inputs=["books_metrics", "customers_metrics"]),
+    ]
 
-    # Clean customers
-    cleaned_customers, customers_metrics = load_and_clean_customers(customers_file)
-    cleaned_customers.to_csv("clean_library_customers.csv", index=False)
 
-    # Clean books
-    cleaned_books, books_metrics = load_and_clean_books(books_file)
-    cleaned_books.to_csv("clean_library_books.csv", index=False)
+if __name__ == "__main__":
+    from checkpoint import clear_checkpoints
+
+    books_work_dir = "work/books"
+
+    # Dates parsed in earlier runs are looked up, not parsed again
+    DATE_CACHE.load("date_cache.csv")
+    stages = pipeline_stages(books_work_dir)
+    values, timings = run_pipeline(
+        stages,
+        initial={
+            "books_file": "03_Library Systembook.csv",
+            "customers_file": "03_Library SystemCustomers.csv",
+        },
+    )
 
-    # Save metrics as a single CSV (2 rows: books + customers)
-    metrics_df = pd.DataFrame([books_metrics, customers_metrics])
-    metrics_df.to_csv("data_quality_metrics.csv", index=False)
+    print(f"\nBooks changes: {values['books_changes']}")
+    print(f"Customers changes: {values['customers_changes']}")
 
     print("\nSaved: clean_library_books.csv")
     print("Saved: clean_library_customers.csv")
     print("Saved: data_quality_metrics.csv")
+    print("Saved: loan_overlaps.csv")
+    print("Saved: loan_daily_series.csv")
+    print("Saved: clean_library_books.delta.csv, clean_library_customers.delta.csv")
+    print("Saved: clean_library_books.quarantine.csv, clean_library_customers.quarantine.csv (rows with no usable key)")
+    print("Saved: clean_library_books/ (partitioned by checkout month)")
+
+    print_timing_report(stages, timings)
+
+    # Everything is written, so the next run starts from scratch
+    clear_checkpoints(books_work_dir)
+    DATE_CACHE.save("date_cache.csv")
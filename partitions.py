@@ -0,0 +1,145 @@
+import os
+
+import pandas as pd
+
+# Loans without a usable checkout date still need a home on disk
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+BOOK_DTYPES = {"id": "string", "book_title": "string", "customer_id": "string"}
+BOOK_DATE_COLUMNS = ["checkout_date", "return_date"]
+
+
+def _partition_dir(root: str, year, month) -> str:
+    if year is None:
+        year_part = month_part = DEFAULT_PARTITION
+    else:
+        year_part, month_part = f"{year:04d}", f"{month:02d}"
+    return os.path.join(root, f"checkout_year={year_part}", f"checkout_month={month_part}")
+
+
+def write_partitioned_books(df: pd.DataFrame, root: str = "clean_library_books", prune: bool = True) -> list:
+    """Write cleaned loans as root/checkout_year=YYYY/checkout_month=MM/part-0.csv.
+
+    Two modes:
+
+    - ``prune=True`` (full rewrite, what metrics.py does): ``df`` is the whole
+      cleaned table. Months whose content is unchanged are not rewritten, and
+      partitions with no rows left in ``df`` are removed, e.g. the default
+      partition once a bad checkout date has been fixed.
+    - ``prune=False`` (partial update): only the months present in ``df`` are
+      replaced and every other month is left as it is. ``df`` must then hold
+      every row of each month it touches, not just the changed ones.
+
+    Returns the partition directories written.
+    """
+    checkout = pd.to_datetime(df["checkout_date"])
+    years = checkout.dt.year.astype("Int64")
+    months = checkout.dt.month.astype("Int64")
+
+    written = []
+    kept = set()
+    for (year, month), part in df.groupby([years, months], dropna=False, sort=True):
+        if pd.isna(year):
+            part_dir = _partition_dir(root, None, None)
+        else:
+            part_dir = _partition_dir(root, int(year), int(month))
+        kept.add(os.path.normpath(part_dir))
+
+        target = os.path.join(part_dir, "part-0.csv")
+        text = part.to_csv(index=False)
+        if os.path.exists(target):
+            with open(target, newline="") as f:
+                if f.read() == text:
+                    continue
+
+        # Write next to the target and swap in, so readers never see half a partition
+        os.makedirs(part_dir, exist_ok=True)
+        tmp_path = target + ".tmp"
+        with open(tmp_path, "w", newline="") as f:
+            f.write(text)
+        os.replace(tmp_path, target)
+        written.append(part_dir)
+
+    if prune:
+        for _, _, path in list_partitions(root):
+            if os.path.normpath(path) not in kept:
+                _remove_partition(path)
+
+    return written
+
+
+def _remove_partition(path: str):
+    for name in os.listdir(path):
+        os.remove(os.path.join(path, name))
+    os.rmdir(path)
+    # Drop the year directory too once its last month is gone
+    year_dir = os.path.dirname(path)
+    if not os.listdir(year_dir):
+        os.rmdir(year_dir)
+
+
+def list_partitions(root: str = "clean_library_books") -> list:
+    """Return (year, month, path) for every partition, year/month None for the default one."""
+    partitions = []
+    if not os.path.isdir(root):
+        return partitions
+
+    for year_dir in sorted(os.listdir(root)):
+        if not year_dir.startswith("checkout_year="):
+            continue
+        year_value = year_dir.split("=", 1)[1]
+        for month_dir in sorted(os.listdir(os.path.join(root, year_dir))):
+            if not month_dir.startswith("checkout_month="):
+                continue
+            month_value = month_dir.split("=", 1)[1]
+            path = os.path.join(root, year_dir, month_dir)
+            if year_value == DEFAULT_PARTITION:
+                partitions.append((None, None, path))
+            else:
+                partitions.append((int(year_value), int(month_value), path))
+
+    return partitions
+
+
+def read_partitioned_books(root: str = "clean_library_books", start=None, end=None) -> pd.DataFrame:
+    """Read cleaned loans back, opening only the months that overlap [start, end].
+
+    With no range every partition is read, including loans with no checkout date.
+    Once a range is given those undated loans can never match and are skipped.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    filtered = start is not None or end is not None
+
+    frames = []
+    for year, month, path in list_partitions(root):
+        if year is None:
+            if filtered:
+                continue
+        else:
+            # Prune on the directory name before touching the file
+            month_start = pd.Timestamp(year=year, month=month, day=1)
+            month_end = month_start + pd.offsets.MonthEnd(0)
+            if start is not None and month_end < start.normalize():
+                continue
+            if end is not None and month_start > end:
+                continue
+
+        part_file = os.path.join(path, "part-0.csv")
+        if os.path.exists(part_file):
+            frames.append(
+                pd.read_csv(part_file, dtype=BOOK_DTYPES, parse_dates=BOOK_DATE_COLUMNS)
+            )
+
+    if not frames:
+        return pd.DataFrame(columns=list(BOOK_DTYPES) + BOOK_DATE_COLUMNS)
+
+    df = pd.concat(frames, ignore_index=True)
+
+    # Partitions are whole months, so trim the edges to the exact range
+    if start is not None:
+        df = df[df["checkout_date"] >= start]
+    if end is not None:
+        df = df[df["checkout_date"] <= end]
+
+    return df.reset_index(drop=True)
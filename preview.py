@@ -0,0 +1,476 @@
+import io
+import math
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from checkpoint import BOOK_TEXT_DTYPES
+from compressed_io import detect_codec, open_decompressed
+from metrics import BOOK_COLUMNS, CUSTOMER_COLUMNS, clean_book_rows, guess_book_date_formats
+
+# Blocks are at most this big, and small enough that a sample spans MIN_BLOCKS of them
+BLOCK_BYTES = 64 * 1024
+MIN_BLOCKS = 100
+
+# Fewer sampled hits than this and an interval is only a rough guide
+FEW_HITS = 10
+
+# Fields read_csv turns into NaN by default; a line of nothing else is a blank row
+NA_FIELDS = {
+    b"", b"#N/A", b"#N/A N/A", b"#NA", b"-1.#IND", b"-1.#QNAN", b"-NaN", b"-nan", b"1.#IND", b"1.#QNAN",
+    b"<NA>", b"N/A", b"NA", b"NULL", b"NaN", b"None", b"n/a", b"nan", b"null",
+}
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _t(z: float, df: int) -> float:
+    # Student t quantile matching normal quantile z (Cornish-Fisher); a
+    # sample of a hundred or so blocks needs the slightly wider t interval
+    if df < 1:
+        return z
+    return z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+
+
+def _wilson(p: float, n_eff: float, z: float):
+    centre = (p + z ** 2 / (2 * n_eff)) / (1 + z ** 2 / n_eff)
+    half = z * math.sqrt(p * (1 - p) / n_eff + z ** 2 / (4 * n_eff ** 2)) / (1 + z ** 2 / n_eff)
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _scan_lines(file_path: str):
+    """One pass over every raw line for exact row, blank and duplicate counts.
+
+    Duplicates need every row, so no sample can bound them. Hashing raw lines
+    costs a fraction of parsing and cleaning them, but it still grows with
+    the file, so it only runs when exact counts are asked for. A line of
+    nothing but NA fields is a blank row, and a line repeating an earlier
+    one byte for byte is a duplicate. Returns the counts and the byte
+    offsets (in the decompressed stream) of the duplicate lines.
+    """
+    seen = set()
+    duplicate_offsets = set()
+    rows = blank = 0
+    with open_decompressed(file_path) as f:
+        offset = len(f.readline())
+        for line in f:
+            text = line.rstrip(b"\r\n")
+            if text.strip():
+                rows += 1
+                if all(field.strip(b'"') in NA_FIELDS for field in text.split(b",")):
+                    blank += 1
+                else:
+                    key = hash(text)
+                    if key in seen:
+                        duplicate_offsets.add(offset)
+                    else:
+                        seen.add(key)
+            offset += len(line)
+    return {"rows_loaded": rows, "blank_rows": blank, "duplicate_rows": len(duplicate_offsets)}, duplicate_offsets
+
+
+def _parse_lines(file_path: str, header: bytes, lines: list, dtype=None) -> pd.DataFrame:
+    sample = pd.read_csv(io.BytesIO(header + b"".join(line.rstrip(b"\r\n") + b"\n" for line in lines)), dtype=dtype)
+    if len(sample) != len(lines):
+        raise ValueError(f"{file_path}: rows span lines, so they cannot be sampled line by line")
+    return sample
+
+
+def _reservoir_sample(file_path: str, sample_rows: int, seed: int, dtype=None):
+    """Uniform sample of lines from a stream that cannot be seeked into, in one pass.
+
+    Algorithm L: the gap to the next line that enters the reservoir is drawn
+    directly, so Python only touches the lines that are kept; everything
+    else is decompressed and split in C. The stream still has to be read to
+    the end, which also gives the exact row count. Empty lines are not rows
+    (read_csv skips them) and are dropped from the sample afterwards, which
+    leaves a uniform sample of the rows.
+    """
+    rng = np.random.default_rng(seed)
+    kept = []
+    weight = math.exp(math.log(rng.random()) / sample_rows)
+    next_pick = sample_rows + int(math.log(rng.random()) / math.log(1 - weight))
+    seen = empty = 0
+
+    with open_decompressed(file_path) as stream:
+        header = stream.readline()
+        offset = len(header)
+        tail = b""
+        for block in iter(lambda: stream.read(1 << 20), b""):
+            data = tail + block
+            cut = data.rfind(b"\n") + 1
+            data, tail = data[:cut], data[cut:]
+            lines = data.split(b"\n")[:-1]
+            if not lines:
+                continue
+            empty += lines.count(b"") + lines.count(b"\r")
+
+            starts = None
+            if len(kept) < sample_rows or next_pick < seen + len(lines):
+                starts = offset + np.concatenate([[0], np.cumsum(np.fromiter(map(len, lines), "int64") + 1)])
+            if len(kept) < sample_rows:
+                take = sample_rows - len(kept)
+                kept.extend(zip(starts[:take].tolist(), lines[:take]))
+            while next_pick < seen + len(lines):
+                j = next_pick - seen
+                kept[rng.integers(sample_rows)] = (int(starts[j]), lines[j])
+                weight *= math.exp(math.log(rng.random()) / sample_rows)
+                next_pick += int(math.log(rng.random()) / math.log(1 - weight)) + 1
+
+            seen += len(lines)
+            offset += len(data)
+        if tail:
+            # Last line without a newline
+            seen += 1
+            empty += tail.strip() == b""
+            if len(kept) < sample_rows:
+                kept.append((offset, tail))
+            elif next_pick == seen - 1:
+                kept[rng.integers(sample_rows)] = (offset, tail)
+
+    kept = sorted((line_offset, line) for line_offset, line in kept if line.strip())
+    sample = _parse_lines(file_path, header, [line for _, line in kept], dtype)
+    rows = seen - empty
+    # Every row is its own cluster, drawn from all rows of the file
+    design = {"clusters": np.arange(len(sample)), "population": rows, "sampled": len(sample), "method": "reservoir"}
+    return sample, np.array([line_offset for line_offset, _ in kept], dtype="int64"), design, {"rows_loaded": rows}
+
+
+def _block_sample(file_path: str, sample_rows: int, seed: int, dtype=None):
+    """Read whole lines from randomly chosen fixed-size blocks of the file.
+
+    A line belongs to the block its first byte falls in, so the blocks split
+    the file exactly and the sample is a simple random sample of blocks; the
+    cost depends on the sample size, not the file size. Assumes no quoted
+    field spans a line break, which holds for the library exports.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+
+        # Size the blocks from the first lines' length, so the sample spans enough of them
+        first = f.read(BLOCK_BYTES)
+        line_bytes = len(first) / max(1, first.count(b"\n"))
+        block_bytes = int(min(BLOCK_BYTES, max(1024, line_bytes * sample_rows / MIN_BLOCKS)))
+        slots = max(1, math.ceil((size - data_start) / block_bytes))
+        wanted = min(slots, max(1, math.ceil(sample_rows * line_bytes / block_bytes)))
+
+        rng = np.random.default_rng(seed)
+        chosen = np.sort(rng.choice(slots, size=wanted, replace=False))
+
+        lines = []
+        offsets = []
+        clusters = []
+        for cluster, slot in enumerate(chosen):
+            offset = data_start + int(slot) * block_bytes
+            end = min(offset + block_bytes, size)
+            f.seek(offset - 1 if offset > data_start else offset)
+            if offset > data_start:
+                # Step past the line already in progress at the block start
+                f.readline()
+            while f.tell() < end:
+                line_offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                # read_csv skips empty lines, so they are not rows
+                if line.strip():
+                    lines.append(line)
+                    offsets.append(line_offset)
+                    clusters.append(cluster)
+
+    sample = _parse_lines(file_path, header, lines, dtype)
+    design = {"clusters": np.array(clusters, dtype="int64"), "population": slots, "sampled": wanted, "method": "block"}
+    return sample, np.array(offsets, dtype="int64"), design, {}
+
+
+def _sample(file_path: str, sample_rows: int, seed: int, method: str, exact_counts: bool, dtype=None):
+    if method == "block" and detect_codec(file_path) is not None:
+        # Compressed streams cannot be seeked into, so fall back to one pass
+        method = "reservoir"
+    sampler = _block_sample if method == "block" else _reservoir_sample
+    sample, offsets, design, counts = sampler(file_path, sample_rows, seed, dtype)
+
+    duplicate = np.zeros(len(sample), dtype=bool)
+    if not exact_counts and design["sampled"] >= design["population"]:
+        # The sample is the whole file, so count exactly, as the loaders do
+        blank = sample.isna().all(axis=1)
+        duplicate = sample[~blank].duplicated().reindex(sample.index, fill_value=False).to_numpy()
+        counts = {"rows_loaded": len(sample), "blank_rows": int(blank.sum()), "duplicate_rows": int(duplicate.sum())}
+    if exact_counts:
+        counts, duplicate_offsets = _scan_lines(file_path)
+        duplicate = np.isin(offsets, np.fromiter(duplicate_offsets, "int64", len(duplicate_offsets)))
+    return sample, counts, duplicate, design
+
+
+def _ratio(y: np.ndarray, x: np.ndarray, design: dict):
+    """sum(y) / sum(x) and its standard error, linearised over the sampled clusters."""
+    y = np.asarray(y, dtype="float64")
+    x = np.asarray(x, dtype="float64")
+    if x.sum() == 0:
+        return None, None
+    ratio = y.sum() / x.sum()
+
+    sampled, population = design["sampled"], design["population"]
+    if sampled >= population:
+        return ratio, 0.0
+    if sampled < 2:
+        return ratio, None
+    residuals = np.bincount(design["clusters"], weights=y - ratio * x, minlength=sampled)
+    x_totals = np.bincount(design["clusters"], weights=x, minlength=sampled)
+    variance = (1 - sampled / population) * residuals.var(ddof=1) / sampled / x_totals.mean() ** 2
+    return ratio, math.sqrt(variance)
+
+
+def _share(hits: np.ndarray, rows: np.ndarray, design: dict, z: float):
+    """Share of ``rows`` with a flag set: Wilson interval on the design's effective sample size.
+
+    Rows sampled in blocks tend to resemble each other, so a block sample
+    carries less information than as many independent rows; the design
+    effect (cluster variance over simple-random-sample variance) says how much.
+    """
+    hits = np.asarray(hits, dtype=bool) & rows
+    n = int(rows.sum())
+    p, se = _ratio(hits, rows, design)
+    if p is None:
+        return None, None, None
+    if se == 0 and design["sampled"] >= design["population"]:
+        return p, p, p
+
+    fpc = 1 - design["sampled"] / design["population"]
+    if se and 0 < p < 1:
+        n_eff = p * (1 - p) / se ** 2
+    else:
+        # Nothing to measure clustering on (no hits, or all hits): treat rows as independent
+        n_eff = n / fpc
+    low, high = _wilson(p, n_eff, z)
+    return p, low, high
+
+
+def _mean_interval(y, x, design: dict, z: float):
+    ratio, se = _ratio(y, x, design)
+    if ratio is None or se is None:
+        return ratio, None, None
+    return ratio, ratio - z * se, ratio + z * se
+
+
+def _median(values: pd.Series, rows: np.ndarray, design: dict, z: float):
+    """Sample median with a Woodruff interval: the CDF's interval at the median, inverted."""
+    rows = rows & values.notna().to_numpy()
+    observed = values[rows].to_numpy(dtype="float64")
+    if len(observed) == 0:
+        return None, None, None
+    median = float(np.median(observed))
+
+    _, se = _ratio(rows & (values.fillna(np.inf).to_numpy() <= median), rows, design)
+    if se is None:
+        return median, None, None
+    low = float(np.quantile(observed, max(0.0, 0.5 - z * se), method="lower"))
+    high = float(np.quantile(observed, min(1.0, 0.5 + z * se), method="higher"))
+    return median, low, high
+
+
+def _total(y: np.ndarray, design: dict):
+    """File-wide total of ``y`` and its standard error, expanded from the sampled clusters."""
+    sampled, population = design["sampled"], design["population"]
+    per_cluster = np.bincount(design["clusters"], weights=np.asarray(y, dtype="float64"), minlength=sampled)
+    total = population * per_cluster.mean() if sampled else 0.0
+    if sampled >= population or sampled < 2:
+        return total, 0.0
+    return total, population * math.sqrt((1 - sampled / population) * per_cluster.var(ddof=1) / sampled)
+
+
+def _reliability(hits: int, design: dict) -> str:
+    if design["sampled"] >= design["population"]:
+        return "exact"
+    return "rough" if hits < FEW_HITS else "sampled"
+
+
+class _Estimates(dict):
+    """metric -> (estimate, ci_low, ci_high, reliability)."""
+
+    def add(self, name, values, reliability="sampled"):
+        self[name] = tuple(values) + (reliability,)
+
+    def add_total(self, name, y, design, z):
+        total, se = _total(y, design)
+        self.add(name, (total, max(0.0, total - z * se), total + z * se),
+                 "exact" if se == 0 else _reliability(int(np.sum(y)), design))
+
+    def add_count(self, name, hits, kept, rows_after, design, z):
+        """Share of the cleaned rows in the sample, times the cleaned row count.
+
+        ``rows_after`` is (count, standard error, duplicates removed). When
+        the count is itself estimated, its error is added to the share's in
+        quadrature (delta method; a ratio and the total it scales are
+        uncorrelated to first order). Counts that still include duplicate
+        rows are only rough.
+        """
+        p, low, high = _share(hits, kept, design, z)
+        if p is None:
+            self.add(name, (0, 0, 0), "exact")
+            return
+        rows, rows_se, deduplicated = rows_after
+        spread = p * z * rows_se
+        reliability = _reliability(int((hits & kept).sum()), design)
+        self.add(name, (
+            p * rows,
+            max(0.0, p * rows - math.hypot((p - low) * rows, spread)),
+            p * rows + math.hypot((high - p) * rows, spread),
+        ), reliability if deduplicated or reliability == "exact" else "rough")
+
+
+def _row_estimates(counts: dict, blank: np.ndarray, design: dict, z: float):
+    """Row count metrics, and the cleaned row count (with its standard error) that other counts scale by.
+
+    With the exact scan's counts every figure is exact. Without them rows
+    and blank rows are estimated from the sample, while duplicates, which no
+    sample can bound, are not estimated: the other counts then include any
+    duplicate rows and are flagged rough.
+    """
+    estimates = _Estimates()
+    if "duplicate_rows" in counts:
+        rows_after = counts["rows_loaded"] - counts["blank_rows"] - counts["duplicate_rows"]
+        estimates.add("rows_loaded", (counts["rows_loaded"],) * 3, "exact")
+        estimates.add("blank_rows_removed", (counts["blank_rows"],) * 3, "exact")
+        estimates.add("duplicate_rows_removed", (counts["duplicate_rows"],) * 3, "exact")
+        estimates.add("rows_after_cleaning", (rows_after,) * 3, "exact")
+        return estimates, (rows_after, 0.0, True)
+
+    rows = np.ones(len(blank))
+    if "rows_loaded" in counts:
+        estimates.add("rows_loaded", (counts["rows_loaded"],) * 3, "exact")
+    else:
+        estimates.add_total("rows_loaded", rows, design, z)
+    estimates.add_total("blank_rows_removed", blank, design, z)
+    estimates.add("duplicate_rows_removed", (None, None, None), "not_estimated")
+    estimates.add("rows_after_cleaning", (None, None, None), "not_estimated")
+    return estimates, _total(~blank, design) + (False,)
+
+
+def _to_frame(dataset: str, method: str, sample_rows: int, estimates: dict, confidence: float) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "dataset": dataset,
+                "metric": metric,
+                "estimate": value,
+                "ci_low": low,
+                "ci_high": high,
+                "confidence": confidence,
+                # exact / sampled / rough (few sampled hits, or duplicates
+                # still counted) / not_estimated
+                "reliability": reliability,
+                "method": method,
+                "sample_rows": sample_rows,
+            }
+            for metric, (value, low, high, reliability) in estimates.items()
+        ]
+    )
+
+
+def _book_date_formats(file_path: str) -> dict:
+    # The sample's first dates are not the file's, so take the formats from the top of the file
+    formats = {}
+    with open_decompressed(file_path) as stream, \
+            pd.read_csv(stream, chunksize=1000, dtype=BOOK_TEXT_DTYPES) as reader:
+        for chunk in reader:
+            guessed = guess_book_date_formats(chunk.rename(columns=BOOK_COLUMNS))
+            formats = {col: formats.get(col) or guessed[col] for col in guessed}
+            if all(formats.values()):
+                break
+    return formats
+
+
+def preview_books(file_path: str, sample_rows: int = 20_000, seed: int = 0, method: str = "block",
+                  confidence: float = 0.95, exact_counts: bool = False) -> pd.DataFrame:
+    """Quick estimate of every books data-quality metric from a sample.
+
+    The cleaning rules of load_and_clean_books run on the sample only, and
+    every figure comes back with a confidence interval and a reliability
+    flag, one row per metric. The cost depends on the sample size, not the
+    file size (a compressed file still has to be decompressed once).
+
+    Duplicate rows cannot be estimated from a sample, so by default they are
+    not estimated, and the other counts include any duplicates (flagged
+    rough; rates and averages are unaffected as long as duplicates look
+    like the other rows).
+    ``exact_counts=True`` adds one pass over every line that makes the row,
+    blank and duplicate counts exact and takes duplicates out of the rest.
+    Overlapping loans depend on every loan of the same title, so they are
+    not estimated either.
+    """
+    sample, counts, duplicate, design = _sample(file_path, sample_rows, seed, method, exact_counts, BOOK_TEXT_DTYPES)
+    z = _t(_z(confidence), design["sampled"] - 1)
+
+    # Sampled rows that survive cleaning: not blank, not a repeat of an earlier row
+    blank = sample.isna().all(axis=1).to_numpy()
+    kept = ~blank & ~duplicate
+    estimates, rows_after = _row_estimates(counts, blank, design, z)
+    df = clean_book_rows(sample.rename(columns=BOOK_COLUMNS), date_formats=_book_date_formats(file_path))
+
+    def add_count(name, flag):
+        estimates.add_count(name, flag.to_numpy(dtype=bool), kept, rows_after, design, z)
+
+    add_count("missing_customer_ids", df["customer_id"].isna())
+    add_count("invalid_checkout_dates", df["checkout_date"].isna())
+    add_count("invalid_return_dates", df["return_date"].isna())
+
+    borrowed_days = (df["return_date"] - df["checkout_date"]).dt.days
+    with_dates = kept & borrowed_days.notna().to_numpy()
+    overdue = borrowed_days.notna() & (borrowed_days > 14)
+    on_time = borrowed_days.notna() & (borrowed_days <= 14)
+
+    add_count("books_due_over_2_weeks", overdue)
+    estimates.add("avg_borrowed_days",
+                  _mean_interval(borrowed_days.fillna(0).to_numpy() * with_dates, with_dates, design, z),
+                  _reliability(int(with_dates.sum()), design))
+    estimates.add("median_borrowed_days", _median(borrowed_days, kept, design, z),
+                  _reliability(int(with_dates.sum()), design))
+    add_count("on_time_returns", on_time)
+    add_count("overdue_returns", overdue)
+    estimates.add("overdue_rate", _share(overdue.to_numpy(), with_dates, design, z),
+                  _reliability(int((with_dates & overdue.to_numpy()).sum()), design))
+    estimates.add("overlapping_loans", (None, None, None), "not_estimated")
+
+    return _to_frame("books", design["method"], len(sample), estimates, confidence)
+
+
+def preview_customers(file_path: str, sample_rows: int = 20_000, seed: int = 0, method: str = "block",
+                      confidence: float = 0.95, exact_counts: bool = False) -> pd.DataFrame:
+    sample, counts, duplicate, design = _sample(file_path, sample_rows, seed, method, exact_counts)
+    z = _t(_z(confidence), design["sampled"] - 1)
+
+    blank = sample.isna().all(axis=1).to_numpy()
+    kept = ~blank & ~duplicate
+    estimates, rows_after = _row_estimates(counts, blank, design, z)
+    missing = sample.rename(columns=CUSTOMER_COLUMNS)["customer_id"].astype("string").str.strip().isna()
+    estimates.add_count("missing_customer_ids", missing.to_numpy(), kept, rows_after, design, z)
+
+    return _to_frame("customers", design["method"], len(sample), estimates, confidence)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # --exact adds the full pass for exact row, blank and duplicate counts
+    exact_counts = "--exact" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--exact"]
+    books_file = args[0] if len(args) > 0 else "03_Library Systembook.csv"
+    customers_file = args[1] if len(args) > 1 else "03_Library SystemCustomers.csv"
+
+    started = time.perf_counter()
+    preview = pd.concat([
+        preview_books(books_file, exact_counts=exact_counts),
+        preview_customers(customers_file, exact_counts=exact_counts),
+    ], ignore_index=True)
+
+    with pd.option_context("display.max_rows", None, "display.width", 120):
+        print(preview[["dataset", "metric", "estimate", "ci_low", "ci_high", "reliability"]])
+    print(f"\nPreview finished in {time.perf_counter() - started:.2f}s")
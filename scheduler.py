@@ -0,0 +1,197 @@
+import io
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+class Stage:
+    """One step of the pipeline.
+
+    ``func`` is called with the values named in ``inputs`` (in order). Its return
+    value is stored under ``outputs``: as-is for one output, unpacked for several.
+    """
+
+    def __init__(self, name: str, func, inputs=(), outputs=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+def _check_graph(stages, initial):
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers or output in initial:
+                raise ValueError(f"{output} is produced twice ({producers.get(output, 'initial values')}, {stage.name})")
+            producers[output] = stage.name
+
+    for stage in stages:
+        for name in stage.inputs:
+            if name not in producers and name not in initial:
+                raise ValueError(f"Stage {stage.name} needs {name}, which nothing produces")
+
+    # Kahn's algorithm just to reject cycles before anything runs
+    available = set(initial)
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(name in available for name in stage.inputs)]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {[stage.name for stage in remaining]}")
+        for stage in ready:
+            available.update(stage.outputs)
+            remaining.remove(stage)
+
+    return producers
+
+
+class _StageOutput:
+    """sys.stdout stand-in that keeps each stage thread's prints to itself."""
+
+    def __init__(self, target):
+        self.target = target
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (self.target if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+def _run_stage(func, args):
+    # Buffer what the stage prints, so stages running side by side do not
+    # interleave their reports; the main thread prints it when the stage ends
+    output = io.StringIO()
+    stdout = sys.stdout
+    if isinstance(stdout, _StageOutput):
+        stdout.local.buffer = output
+    else:
+        # Worker process: one stage at a time, so swapping stdout is safe
+        sys.stdout = output
+
+    try:
+        started = time.perf_counter()
+        result = func(*args)
+        finished = time.perf_counter()
+    except BaseException:
+        # Keep what the stage printed before it failed
+        _restore_stdout(stdout)
+        sys.stdout.write(output.getvalue())
+        raise
+    _restore_stdout(stdout)
+    return result, started, finished, output.getvalue()
+
+
+def _restore_stdout(stdout):
+    if isinstance(stdout, _StageOutput):
+        stdout.local.buffer = None
+    else:
+        sys.stdout = stdout
+
+
+def run_pipeline(stages, initial=None, workers: int = 4, executor: str = "thread"):
+    """Run stages as soon as their inputs exist, independent ones side by side.
+
+    Use ``executor="process"`` for CPU-bound stages; their functions and data
+    must then be picklable. Whatever a stage prints is held back and printed
+    in one block when it finishes. Returns (values, timings), where timings
+    maps each stage to its start, end and duration in seconds from the
+    pipeline start.
+    """
+    values = dict(initial or {})
+    _check_graph(stages, values)
+
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    pending = list(stages)
+    running = {}
+    timings = {}
+    origin = time.perf_counter()
+
+    stdout = sys.stdout
+    if executor != "process":
+        sys.stdout = _StageOutput(stdout)
+
+    try:
+        with pool_class(max_workers=workers) as pool:
+            while pending or running:
+                _submit_ready(pool, pending, running, values)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    result, started, finished, output = future.result()
+                    # Each stage's report comes out in one piece, in finishing order
+                    print(output, end="")
+
+                    if len(stage.outputs) == 1:
+                        values[stage.outputs[0]] = result
+                    elif stage.outputs:
+                        values.update(zip(stage.outputs, result))
+
+                    timings[stage.name] = {
+                        "start": started - origin,
+                        "end": finished - origin,
+                        "seconds": finished - started,
+                    }
+    finally:
+        sys.stdout = stdout
+
+    return values, timings
+
+
+def _submit_ready(pool, pending, running, values):
+    for stage in [s for s in pending if all(name in values for name in s.inputs)]:
+        args = [values[name] for name in stage.inputs]
+        running[pool.submit(_run_stage, stage.func, args)] = stage
+        pending.remove(stage)
+
+
+def critical_path(stages, timings):
+    """Longest chain of dependent stages by measured duration.
+
+    This chain bounds the wall time no matter how many workers there are.
+    """
+    producers = {output: stage for stage in stages for output in stage.outputs}
+    finish = {}
+    previous = {}
+
+    def longest(stage):
+        if stage.name not in finish:
+            parents = {producers[name].name: producers[name] for name in stage.inputs if name in producers}
+            best_parent = max(parents.values(), key=longest, default=None)
+            base = longest(best_parent) if best_parent is not None else 0.0
+            finish[stage.name] = base + timings[stage.name]["seconds"]
+            previous[stage.name] = best_parent.name if best_parent is not None else None
+        return finish[stage.name]
+
+    last = max(stages, key=longest)
+    path = []
+    name = last.name
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+
+    return list(reversed(path)), finish[last.name]
+
+
+def print_timing_report(stages, timings):
+    total = max(timing["end"] for timing in timings.values())
+    busy = sum(timing["seconds"] for timing in timings.values())
+    path, path_seconds = critical_path(stages, timings)
+
+    print("\n--- Stage timings ---")
+    for stage in sorted(stages, key=lambda s: timings[s.name]["start"]):
+        timing = timings[stage.name]
+        marker = "*" if stage.name in path else " "
+        print(f"{marker} {stage.name:<24} {timing['start']:8.3f}s -> {timing['end']:8.3f}s  ({timing['seconds']:.3f}s)")
+    print(f"Wall time: {total:.3f}s, stage time: {busy:.3f}s")
+    print(f"Critical path ({path_seconds:.3f}s): {' -> '.join(path)}")
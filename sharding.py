@@ -0,0 +1,124 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from compressed_io import read_raw_csv
+from metrics import BOOK_COLUMNS, CUSTOMER_COLUMNS, clean_book_rows, clean_customer_rows, guess_book_date_formats
+
+SHARD_KEY = "customer_id"
+
+
+def shard_ids(keys: pd.Series, shards: int) -> np.ndarray:
+    """Stable shard number for each key; equal keys (and all NaNs) share a shard.
+
+    Keys are hashed as trimmed text, the form cleaning leaves them in, so raw
+    rows land in the same shard as their cleaned join partners.
+    """
+    text = keys.astype("string").str.strip().fillna("")
+    hashes = pd.util.hash_array(text.to_numpy(dtype=object))
+    return (hashes % np.uint64(shards)).astype("int64")
+
+
+def write_shards(df: pd.DataFrame, shard_dir: str, name: str, shards: int, key: str = SHARD_KEY) -> list:
+    """Split df into shards by key hash and write one pickle per shard.
+
+    The files are the hand-off between processes today and between machines later.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    ids = shard_ids(df[key], shards)
+    paths = []
+    for shard in range(shards):
+        path = os.path.join(shard_dir, f"{name}-{shard:04d}-of-{shards:04d}.pkl")
+        df[ids == shard].to_pickle(path)
+        paths.append(path)
+    return paths
+
+
+def _drop_blank_and_duplicates(df: pd.DataFrame):
+    blank = df.isna().all(axis=1)
+    df = df[~blank]
+    duplicated = df.duplicated()
+    return df[~duplicated], int(blank.sum()), int(duplicated.sum())
+
+
+def process_shard(books_path: str, customers_path: str, key: str = SHARD_KEY, date_formats: dict = None):
+    """Dedupe, clean and join one shard of the raw exports.
+
+    Identical rows share a key, and so a shard, so duplicates and join
+    partners never cross shards and the per-shard counts add up exactly.
+    Dates are parsed in ``date_formats``, the whole export's formats.
+    """
+    books = pd.read_pickle(books_path)
+    customers = pd.read_pickle(customers_path)
+
+    books, books_blank, books_duplicates = _drop_blank_and_duplicates(books)
+    customers, customers_blank, customers_duplicates = _drop_blank_and_duplicates(customers)
+
+    books = clean_book_rows(books.copy(), date_formats=date_formats)
+    books["borrowed_days"] = (books["return_date"] - books["checkout_date"]).dt.days
+    customers = clean_customer_rows(customers.copy())
+
+    # Carry the original loan position through the merge for re-ordering
+    joined = books.rename_axis("_row").reset_index().merge(customers, on=key, how="left")
+    counts = {
+        "books_blank_rows_removed": books_blank,
+        "books_duplicate_rows_removed": books_duplicates,
+        "customers_blank_rows_removed": customers_blank,
+        "customers_duplicate_rows_removed": customers_duplicates,
+    }
+    return joined, counts
+
+
+def sharded_join(books: pd.DataFrame, customers: pd.DataFrame, shards: int = 4,
+                 shard_dir: str = None, workers: int = None, key: str = SHARD_KEY):
+    """Hash-partition the raw (renamed) books and customers by key, then drop
+    blank and duplicate rows, clean and join each shard in its own worker
+    process and stitch the results back together.
+
+    Shard files go to a temporary directory (inside ``shard_dir`` if given)
+    that is removed afterwards, so no run sees another run's shards.
+    Returns the joined loans (in the original loan order) and row counts.
+    """
+    # The index rides along in the shard files and restores loan order at the end
+    books = books.reset_index(drop=True)
+    # A shard's first date is not the export's, so settle the date formats up front
+    date_formats = guess_book_date_formats(books)
+
+    if shard_dir is not None:
+        os.makedirs(shard_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="shards-", dir=shard_dir) as run_dir:
+        books_paths = write_shards(books, run_dir, "books", shards, key)
+        customers_paths = write_shards(customers, run_dir, "customers", shards, key)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                process_shard, books_paths, customers_paths, [key] * shards, [date_formats] * shards
+            ))
+
+    joined = pd.concat([result[0] for result in results], ignore_index=True)
+    joined = joined.sort_values("_row", kind="mergesort").drop(columns="_row").reset_index(drop=True)
+
+    counts = {name: sum(result[1][name] for result in results) for name in results[0][1]}
+    return joined, counts
+
+
+def load_raw_exports(books_file: str, customers_file: str):
+    books = read_raw_csv(books_file).rename(columns=BOOK_COLUMNS)
+    customers = read_raw_csv(customers_file).rename(columns=CUSTOMER_COLUMNS)
+    return books, customers
+
+
+if __name__ == "__main__":
+    import sys
+
+    shards = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    books, customers = load_raw_exports("03_Library Systembook.csv", "03_Library SystemCustomers.csv")
+    loans, counts = sharded_join(books, customers, shards=shards)
+    loans.to_csv("clean_library_loans.csv", index=False)
+
+    print(f"\nSharded clean + join across {shards} shards: {counts}")
+    print("Saved: clean_library_loans.csv")
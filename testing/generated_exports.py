@@ -0,0 +1,35 @@
+# Seeded stand-ins for the branch exports, for tests that need more rows than the real ones
+import numpy as np
+import pandas as pd
+
+BOOK_ROWS = 20000
+CUSTOMER_ROWS = 5000
+
+
+def write_books_export(path, rows=BOOK_ROWS, seed=26):
+    # Same shape as the branch export: quoted checkout dates, blank rows, repeats
+    rng = np.random.default_rng(seed)
+    checkout = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    returned = checkout + pd.to_timedelta(rng.integers(-5, 40, rows), unit="D")
+    books = pd.DataFrame({
+        "Id": np.arange(1, rows + 1),
+        "Books": rng.choice(["Catcher in the Rye ", "The hobbit", "Dune ", "Little Women", "1984"], rows),
+        "Book checkout": checkout.strftime('"%d/%m/%Y"'),
+        "Book Returned": returned.strftime("%d/%m/%Y"),
+        "Days allowed to borrow": "2 weeks",
+        "Customer ID": rng.integers(1, CUSTOMER_ROWS, rows),
+    })
+    books.loc[rng.random(rows) < 0.01, "Book checkout"] = '"32/05/2023"'
+    books = pd.concat([books, books.iloc[: rows // 100]], ignore_index=True)
+    books.loc[rng.random(len(books)) < 0.05] = np.nan
+    books.to_csv(path, index=False)
+
+
+def write_customers_export(path, rows=CUSTOMER_ROWS, seed=26):
+    rng = np.random.default_rng(seed)
+    customers = pd.DataFrame({
+        "Customer ID": np.arange(1, rows + 1),
+        "Customer Name": rng.choice(["Jane Doe", "John Smith", "Dan Reeves", "Emory Ted"], rows),
+    })
+    customers.loc[rng.random(rows) < 0.05] = np.nan
+    customers.to_csv(path, index=False)
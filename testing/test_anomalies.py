@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from anomalies import find_overlapping_loans
+
+class TestOverlappingLoans(unittest.TestCase):
+    def setUp(self):
+        self.books = pd.DataFrame({
+            "id": ["1", "2", "3", "4", "5"],
+            "book_title": ["Dune", "dune ", "Dune", "Emma", "Emma"],
+            "checkout_date": pd.to_datetime(["2023-01-01", "2023-01-03", "2023-01-10", "2023-01-01", "2023-01-05"]),
+            "return_date": pd.to_datetime(["2023-01-10", "2023-01-04", None, "2023-01-05", "2023-01-06"]),
+        })
+
+    def test_overlap_flagged_against_holder(self):
+        flagged = find_overlapping_loans(self.books)
+        self.assertEqual(list(flagged["id"]), ["2"])
+        self.assertEqual(list(flagged["overlaps_with_id"]), ["1"])
+        self.assertEqual(list(flagged["overlap_days"]), [1.0])
+
+    def test_same_day_handover_is_not_overlap(self):
+        flagged = find_overlapping_loans(self.books)
+        self.assertNotIn("3", list(flagged["id"]))
+        self.assertNotIn("5", list(flagged["id"]))
+
+
+if __name__ =='__main__':
+    unittest.main()
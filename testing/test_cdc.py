@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cdc import capture_changes
+
+class TestChangeCapture(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.tmp.name, "customers.manifest.csv")
+        self.delta = os.path.join(self.tmp.name, "customers.delta.csv")
+        self.customers = pd.DataFrame({
+            "customer_id": ["1", "2", "3"],
+            "customer_name": ["Jane Doe", "John Smith", "Dan Reeves"],
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_first_run_is_all_inserts(self):
+        changes = capture_changes(self.customers, "customer_id", self.manifest, self.delta)
+        self.assertEqual(changes["inserts"], 3)
+
+    def test_only_changes_written(self):
+        capture_changes(self.customers, "customer_id", self.manifest, self.delta)
+
+        update = self.customers.drop(index=0)
+        update.loc[1, "customer_name"] = "Jon Smith"
+        update.loc[3] = ["4", "Emory Ted"]
+        changes = capture_changes(update, "customer_id", self.manifest, self.delta)
+
+        self.assertEqual(changes, {"inserts": 1, "updates": 1, "deletes": 1, "unchanged": 1, "quarantined": 0})
+        delta = pd.read_csv(self.delta, dtype="string")
+        self.assertEqual(dict(zip(delta["customer_id"], delta["_change"])),
+                         {"2": "update", "4": "insert", "1": "delete"})
+
+    def test_missing_and_duplicate_keys_quarantined(self):
+        capture_changes(self.customers, "customer_id", self.manifest, self.delta)
+
+        update = pd.concat([self.customers, pd.DataFrame({
+            "customer_id": [None, "3"],
+            "customer_name": ["Bob Stone", "Dan Reeves Jr"],
+        })], ignore_index=True)
+        quarantine = os.path.join(self.tmp.name, "customers.quarantine.csv")
+        changes = capture_changes(update, "customer_id", self.manifest, self.delta, quarantine)
+
+        # Key 3 is now ambiguous: held back, not reported as deleted
+        self.assertEqual(changes, {"inserts": 0, "updates": 0, "deletes": 0, "unchanged": 2, "quarantined": 3})
+        self.assertEqual(len(pd.read_csv(quarantine)), 3)
+
+        # Once the key is unique again it is compared with its old hash
+        changes = capture_changes(self.customers, "customer_id", self.manifest, self.delta)
+        self.assertEqual(changes["unchanged"], 3)
+
+
+if __name__ =='__main__':
+    unittest.main()
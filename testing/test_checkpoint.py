@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import checkpoint
+from metrics import load_and_clean_books
+
+BOOKS_FILE = os.path.join(ROOT, "03_Library Systembook.csv")
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.work_dir = os.path.join(self.tmp.name, "books")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_export(self, lines):
+        path = os.path.join(self.tmp.name, "books.csv")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def resume_after_failure(self, file_path, fail_on_chunk):
+        """Fail on one chunk, rerun, and return (result, records cleaned on the rerun)."""
+        real_clean_chunk = checkpoint._clean_chunk
+        calls = []
+
+        def failing_clean_chunk(chunk, *args):
+            if len(calls) == fail_on_chunk:
+                raise OSError("disk full")
+            calls.append(len(chunk))
+            return real_clean_chunk(chunk, *args)
+
+        with mock.patch.object(checkpoint, "_clean_chunk", failing_clean_chunk):
+            with self.assertRaises(OSError):
+                checkpoint.load_and_clean_books_resumable(file_path, self.work_dir, chunksize=10)
+
+        def counting_clean_chunk(chunk, *args):
+            calls.append(len(chunk))
+            return real_clean_chunk(chunk, *args)
+
+        calls.clear()
+        with mock.patch.object(checkpoint, "_clean_chunk", counting_clean_chunk):
+            result = checkpoint.load_and_clean_books_resumable(file_path, self.work_dir, chunksize=10)
+        return result, sum(calls)
+
+    def assert_same_result(self, result, expected):
+        (df, metrics), (expected_df, expected_metrics) = result, expected
+        expected_metrics.pop("run_timestamp")
+        metrics.pop("run_timestamp")
+        self.assertEqual(metrics, expected_metrics)
+        self.assertTrue(df.equals(expected_df))
+
+    def test_resume_matches_uninterrupted_run(self):
+        expected = load_and_clean_books(BOOKS_FILE)
+
+        # Fail on the fourth chunk, then rerun
+        result, cleaned = self.resume_after_failure(BOOKS_FILE, 3)
+
+        # Only the remaining chunks were cleaned the second time round
+        self.assertEqual(cleaned, 114 - 30)
+        self.assert_same_result(result, expected)
+
+    def test_resume_after_empty_line(self):
+        with open(BOOKS_FILE) as f:
+            lines = f.read().splitlines()
+        # An empty line is not a record, so line and record counts drift apart
+        file_path = self.write_export(lines[:5] + [""] + lines[5:])
+
+        expected = load_and_clean_books(file_path)
+        result, _ = self.resume_after_failure(file_path, 2)
+        self.assert_same_result(result, expected)
+
+    def test_resume_when_a_chunk_starts_with_an_invalid_date(self):
+        lines = ["Id,Books,Book checkout,Book Returned,Days allowed to borrow,Customer ID"]
+        lines += [f"{i},Dune,0{i % 9 + 1}/03/2023,20/03/2023,2 weeks,{i}" for i in range(1, 11)]
+        # The second chunk starts with an invalid date and later holds an ISO one
+        lines += ["11,Dune,32/05/2023,20/03/2023,2 weeks,11", "12,Emma,2023-06-01,2023-06-09,2 weeks,12"]
+        lines += [f"{i},Dune,01/03/2023,20/03/2023,2 weeks,{i}" for i in range(13, 21)]
+        file_path = self.write_export(lines)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = load_and_clean_books(file_path)
+            result, _ = self.resume_after_failure(file_path, 1)
+
+        self.assertEqual(expected[1]["invalid_checkout_dates"], 2)
+        self.assert_same_result(result, expected)
+
+    def test_ids_without_blank_rows(self):
+        lines = ["Id,Books,Book checkout,Book Returned,Days allowed to borrow,Customer ID"]
+        lines += [f'{i},Dune,"0{i % 9 + 1}/03/2023",20/03/2023,2 weeks,{i % 4 + 1}' for i in range(1, 26)]
+        file_path = self.write_export(lines)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = load_and_clean_books(file_path)
+            df, metrics = checkpoint.load_and_clean_books_resumable(file_path, self.work_dir, chunksize=10)
+
+        self.assertEqual(df["id"].iloc[0], "1")
+        self.assert_same_result((df, metrics), expected)
+
+    def test_ids_when_only_a_later_chunk_has_blank_rows(self):
+        lines = ["Id,Books,Book checkout,Book Returned,Days allowed to borrow,Customer ID"]
+        lines += [f"{i},Dune,01/03/2023,20/03/2023,2 weeks,{i}" for i in range(1, 26)]
+        file_path = self.write_export(lines + [",,,,,"])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = load_and_clean_books(file_path)
+            result = checkpoint.load_and_clean_books_resumable(file_path, self.work_dir, chunksize=10)
+
+        self.assertEqual(result[0]["id"].iloc[0], "1.0")
+        self.assert_same_result(result, expected)
+
+
+if __name__ =='__main__':
+    unittest.main()
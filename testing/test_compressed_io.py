@@ -0,0 +1,130 @@
+import bz2
+import gzip
+import lzma
+import os
+import sys
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from compressed_io import _decompress_to_disk, benchmark_compressed_read, detect_codec, open_decompressed, read_raw_csv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PART_A = b"Customer ID,Customer Name\n1,Jane Doe\n2,John Smith\n"
+PART_B = b"Customer ID,Customer Name\n3,Dan Reeves\n"
+
+class TestCompressedIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.expected = pd.DataFrame({
+            "Customer ID": [1, 2, 3],
+            "Customer Name": ["Jane Doe", "John Smith", "Dan Reeves"],
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name, data=None):
+        path = os.path.join(self.tmp.name, name)
+        if data is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+        return path
+
+    def write_tar(self, name, mode):
+        path = self.path(name)
+        with tarfile.open(path, mode) as archive:
+            # Added out of name order; reading still goes by name
+            for member, data in [("b.csv", PART_B), ("a.csv", PART_A)]:
+                member_path = self.path(member, data)
+                archive.add(member_path, arcname=member)
+        return path
+
+    def test_codec_sniffed_from_content(self):
+        # Extensions are deliberately misleading
+        self.assertIsNone(detect_codec(self.path("plain.gz", PART_A)))
+        self.assertEqual(detect_codec(self.path("a.csv", gzip.compress(PART_A))), "gzip")
+        self.assertEqual(detect_codec(self.path("b.csv", bz2.compress(PART_A))), "bz2")
+        self.assertEqual(detect_codec(self.path("c.csv", lzma.compress(PART_A))), "xz")
+
+    def test_plain_csv(self):
+        df = read_raw_csv(self.path("plain.csv", PART_A + PART_B[len(b"Customer ID,Customer Name\n"):]))
+        pd.testing.assert_frame_equal(df, self.expected)
+
+    def test_single_file_codecs(self):
+        data = PART_A + PART_B[len(b"Customer ID,Customer Name\n"):]
+        for name, compress in [("gzip", gzip.compress), ("bz2", bz2.compress), ("xz", lzma.compress)]:
+            with self.subTest(codec=name):
+                path = self.path(f"export.{name}", compress(data))
+                pd.testing.assert_frame_equal(read_raw_csv(path), self.expected)
+                pd.testing.assert_frame_equal(read_raw_csv(path, chunksize=1), self.expected)
+
+    def test_concatenated_gzip(self):
+        data = gzip.compress(PART_A) + gzip.compress(PART_B[len(b"Customer ID,Customer Name\n"):])
+        pd.testing.assert_frame_equal(read_raw_csv(self.path("export.gz", data)), self.expected)
+
+    def test_zip_members_in_name_order(self):
+        path = self.path("export.zip")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("b.csv", PART_B)
+            archive.writestr("a.csv", PART_A)
+        pd.testing.assert_frame_equal(read_raw_csv(path), self.expected)
+        with self.assertRaises(ValueError):
+            open_decompressed(path)
+
+    def test_tar_read_in_one_pass(self):
+        for mode in ["w", "w:gz", "w:bz2", "w:xz"]:
+            with self.subTest(mode=mode):
+                path = self.write_tar(f"export-{mode[-2:]}.tar", mode)
+                # Random access (getmembers/getmember) would decompress the archive again per member
+                with mock.patch.object(tarfile.TarFile, "getmembers", side_effect=AssertionError("second pass")):
+                    df = read_raw_csv(path)
+                pd.testing.assert_frame_equal(df, self.expected)
+
+    @unittest.skipUnless(zstandard, "needs the zstandard package")
+    def test_zstd_file_and_tar(self):
+        data = PART_A + PART_B[len(b"Customer ID,Customer Name\n"):]
+        path = self.path("export.zst", zstandard.ZstdCompressor().compress(data))
+        pd.testing.assert_frame_equal(read_raw_csv(path), self.expected)
+
+        tar_path = self.write_tar("export.tar", "w")
+        with open(tar_path, "rb") as f:
+            zst_path = self.path("export.tar.zst", zstandard.ZstdCompressor().compress(f.read()))
+        self.assertEqual(detect_codec(zst_path), "zstd")
+        pd.testing.assert_frame_equal(read_raw_csv(zst_path), self.expected)
+
+    def test_benchmark_on_archives(self):
+        zip_path = self.path("export.zip")
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("b.csv", PART_B)
+            archive.writestr("a.csv", PART_A)
+        data = PART_A + PART_B[len(b"Customer ID,Customer Name\n"):]
+        paths = [zip_path, self.write_tar("export.tar.gz", "w:gz"), self.path("export.gz", gzip.compress(data))]
+
+        for path in paths:
+            with self.subTest(path=os.path.basename(path)):
+                results = benchmark_compressed_read(path, repeat=1)
+                self.assertGreater(results["decompress_then_read_seconds"], 0)
+                self.assertGreater(results["streaming_seconds"], 0)
+
+    def test_decompress_then_read_matches_streaming(self):
+        path = self.write_tar("export.tar.xz", "w:xz")
+        extract_dir = self.path("extracted")
+        os.mkdir(extract_dir)
+        pd.testing.assert_frame_equal(read_raw_csv(_decompress_to_disk(path, extract_dir)), self.expected)
+
+    def test_list_of_files(self):
+        paths = [self.path("a.csv.gz", gzip.compress(PART_A)), self.path("b.csv", PART_B)]
+        pd.testing.assert_frame_equal(read_raw_csv(paths, workers=2), self.expected)
+
+
+if __name__ =='__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ROOT)
+from csv_writer import write_csv_atomic
+from metrics import load_and_clean_books
+
+class TestCsvWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_matches_to_csv(self, df, block_rows):
+        write_csv_atomic(df, self.path, workers=2, block_rows=block_rows)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), df.to_csv(index=False).encode())
+
+    def test_cleaned_books_across_blocks(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            df, _ = load_and_clean_books(os.path.join(ROOT, "03_Library Systembook.csv"))
+        self.assert_matches_to_csv(df, block_rows=25)
+
+    def test_sub_second_values_in_one_block(self):
+        df = pd.DataFrame({"at": pd.to_datetime(["2023-01-01 00:00:00", "2023-01-01 00:00:00.5"], format="ISO8601")})
+        self.assert_matches_to_csv(df, block_rows=1)
+
+    def test_every_precision_across_blocks(self):
+        times = {
+            "day": ["2023-01-01", None, "2023-01-03"],
+            "second": ["2023-01-01", None, "2023-01-03 10:00:01"],
+            "milli": ["2023-01-01", None, "2023-01-03 10:00:01.25"],
+            "micro": ["2023-01-01", None, "2023-01-03 10:00:01.000002"],
+            "nano": ["2023-01-01", None, "2023-01-03 10:00:01.000000003"],
+        }
+        df = pd.DataFrame({col: pd.to_datetime(values, format="ISO8601") for col, values in times.items()})
+        df["coarse"] = df["micro"].astype("datetime64[ms]")
+        df["title"] = ["Dune, Part 1", None, 'The "IT" book']
+        self.assert_matches_to_csv(df, block_rows=1)
+
+
+if __name__ =='__main__':
+    unittest.main()
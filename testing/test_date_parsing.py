@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import unittest
+import warnings
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from date_parsing import DateCache, guess_column_format
+
+class TestDateCache(unittest.TestCase):
+    def setUp(self):
+        self.dates = pd.Series(["20/02/2023", "32/05/2023", None, "20/02/2023", "01/06/2023"], dtype="string")
+
+    def test_matches_to_datetime(self):
+        expected = pd.to_datetime(self.dates, errors="coerce", dayfirst=True)
+        parsed = DateCache().parse(self.dates)
+        self.assertTrue(parsed.equals(expected))
+        self.assertEqual(parsed.isna().sum(), 2)
+
+    def test_each_distinct_string_parsed_once(self):
+        cache = DateCache()
+        cache.parse(self.dates)
+        self.assertEqual(len(cache), 3)
+
+        cache.parse(pd.Series(["01/06/2023", "02/06/2023"], dtype="string"))
+        self.assertEqual(len(cache), 4)
+
+    def test_cache_survives_save_and_load(self):
+        cache = DateCache()
+        cache.parse(self.dates)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "date_cache.csv")
+            cache.save(path)
+            reloaded = DateCache().load(path)
+
+        # The invalid date is not saved, only dates that parsed
+        self.assertEqual(len(reloaded), 2)
+        self.assertTrue(reloaded.parse(self.dates).equals(cache.parse(self.dates)))
+
+    def test_format_guessed_per_column(self):
+        cache = DateCache()
+        columns = [
+            self.dates,
+            pd.Series(["2023-02-20", "2023-06-01", "20/02/2023"], dtype="string"),
+            pd.Series(["not a date", "20/02/2023", "2023-06-01"], dtype="string"),
+            self.dates,
+        ]
+        for values in columns:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                expected = pd.to_datetime(values, errors="coerce", dayfirst=True)
+            self.assertTrue(cache.parse(values).equals(expected))
+
+    def test_slices_parse_in_the_whole_column_format(self):
+        column = pd.Series(["20/02/2023", "01/06/2023", "32/05/2023", "2023-06-01"], dtype="string")
+        expected = pd.to_datetime(column, errors="coerce", dayfirst=True)
+
+        # The second slice starts with an invalid date, so guessing from it alone would differ
+        date_format = guess_column_format(column)
+        cache = DateCache()
+        parsed = pd.concat([cache.parse(column[:2], date_format), cache.parse(column[2:], date_format)])
+        self.assertTrue(parsed.equals(expected))
+        self.assertEqual(parsed.isna().sum(), 2)
+
+    def test_failures_under_a_guessed_format_not_saved(self):
+        cache = DateCache()
+        cache.parse(self.dates)
+        iso = pd.Series(["2023-02-20", "2023-06-01"], dtype="string")
+        cache.parse(pd.Series(["20/02/2023"] + list(iso), dtype="string"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "date_cache.csv")
+            cache.save(path)
+            reloaded = DateCache().load(path)
+
+        self.assertTrue(reloaded.parse(iso).equals(pd.to_datetime(iso)))
+
+
+if __name__ =='__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from loan_index import LoanIntervalIndex
+
+class TestLoanIndex(unittest.TestCase):
+    def setUp(self):
+        self.books = pd.DataFrame({
+            "id": ["1", "2", "3", "4"],
+            "book_title": ["Dune", "Dune", "Emma", "IT"],
+            "checkout_date": pd.to_datetime(["2023-01-01", "2023-01-10", "2023-01-05", "2023-01-08"]),
+            "return_date": pd.to_datetime(["2023-01-05", None, "2023-01-06", "2023-01-02"]),
+            "customer_id": ["1", "2", "3", "4"],
+        })
+        self.index = LoanIntervalIndex(self.books)
+
+    def test_active_on(self):
+        active = self.index.active_on("2023-01-05")
+        self.assertEqual(list(active["id"]), ["1", "3"])
+
+    def test_open_loan_never_ends(self):
+        active = self.index.active_on("2030-01-01")
+        self.assertEqual(list(active["id"]), ["2"])
+
+    def test_holders(self):
+        holders = self.index.holders("dune", "2023-01-11")
+        self.assertEqual(list(holders["customer_id"]), ["2"])
+
+    def test_negative_loan_excluded(self):
+        self.assertEqual(self.index.excluded, 1)
+
+    def test_batch_matches_count(self):
+        dates = ["2023-01-01", "2023-01-05", "2023-01-07", "2023-01-12"]
+        counts = self.index.count_active(dates)
+        batch = self.index.active_on_many(dates)
+        self.assertEqual(list(counts), [1, 2, 0, 1])
+        self.assertEqual([len(batch[pd.Timestamp(d)]) for d in dates], [1, 2, 0, 1])
+
+
+if __name__ =='__main__':
+    unittest.main()
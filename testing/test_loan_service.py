@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from loan_service import LoanQueryService, LRUCache, make_handler
+
+class TestLoanService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.books_file = os.path.join(self.tmp.name, "books.csv")
+        self.customers_file = os.path.join(self.tmp.name, "customers.csv")
+        self.books = pd.DataFrame({
+            "id": ["1", "2", "3"],
+            "book_title": ["Dune", "dune", "Emma"],
+            "checkout_date": pd.to_datetime(["2023-01-01", "2023-02-01", "2023-03-01"]),
+            "return_date": pd.to_datetime(["2023-01-05", None, "2023-03-10"]),
+            "time_allowed_to_borrow": ["2 weeks"] * 3,
+            "customer_id": ["1.0", "2.0", "1.0"],
+        })
+        self.books.to_csv(self.books_file, index=False)
+        pd.DataFrame({"customer_id": ["1.0", "2.0"], "customer_name": ["Jane Doe", "Dan Reeves"]}).to_csv(
+            self.customers_file, index=False
+        )
+        self.service = LoanQueryService(self.books_file, self.customers_file, cache_size=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def publish(self, books):
+        books.to_csv(self.books_file, index=False)
+        # Make sure the new version is visible even on coarse mtime clocks
+        stat = os.stat(self.books_file)
+        os.utime(self.books_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_index_lookups(self):
+        by_customer = self.service.loans_for_customer("1")
+        self.assertEqual(by_customer["customer_name"], "Jane Doe")
+        self.assertEqual([loan["id"] for loan in by_customer["loans"]], ["1", "3"])
+
+        by_title = self.service.loans_for_title(" DUNE ")
+        self.assertEqual([loan["id"] for loan in by_title["loans"]], ["1", "2"])
+        self.assertEqual(self.service.loans_for_customer("99")["loans"], [])
+
+    def test_caller_cannot_change_cached_result(self):
+        self.service.loans_for_customer("1")["loans"].clear()
+        self.assertEqual(len(self.service.loans_for_customer("1")["loans"]), 2)
+        self.assertEqual(self.service.cache.hits, 1)
+
+    def test_lru_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_reload_on_publish(self):
+        self.assertEqual(len(self.service.loans_for_customer("2")["loans"]), 1)
+        self.publish(self.books.assign(customer_id=["2.0", "2.0", "1.0"]))
+
+        self.assertEqual(len(self.service.loans_for_customer("2")["loans"]), 2)
+        self.assertEqual(self.service.reloads, 1)
+
+    def test_bad_publish_returns_json_error(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(self.service))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            # A file without the date columns cannot be loaded as a snapshot
+            self.publish(self.books.drop(columns=["checkout_date", "return_date"]))
+            url = f"http://127.0.0.1:{server.server_address[1]}/loans?customer_id=1"
+            with self.assertRaises(urllib.error.HTTPError) as caught:
+                urllib.request.urlopen(url, timeout=5)
+            self.assertEqual(caught.exception.code, 500)
+            self.assertIn("error", json.loads(caught.exception.read()))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ =='__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from partitions import list_partitions, read_partitioned_books, write_partitioned_books
+
+class TestPartitions(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "books")
+        self.books = pd.DataFrame({
+            "id": pd.array(["1", "2", "3"], dtype="string"),
+            "book_title": pd.array(["Dune", "IT", "Emma"], dtype="string"),
+            "checkout_date": pd.to_datetime(["2023-02-20", "2023-03-24", None]),
+            "return_date": pd.to_datetime(["2023-02-25", "2023-03-30", None]),
+            "customer_id": pd.array(["1", "2", "3"], dtype="string"),
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_range_prunes_months(self):
+        write_partitioned_books(self.books, self.root)
+        df = read_partitioned_books(self.root, start="2023-03-01", end="2023-03-31")
+        self.assertEqual(list(df["id"]), ["2"])
+
+    def test_only_touched_partitions_rewritten(self):
+        write_partitioned_books(self.books, self.root)
+        update = self.books.copy()
+        update.loc[1, "book_title"] = "It"
+        written = write_partitioned_books(update, self.root)
+
+        self.assertEqual(len(written), 1)
+        df = read_partitioned_books(self.root)
+        self.assertEqual(len(df), 3)
+        self.assertIn("It", list(df["book_title"]))
+
+    def test_full_rewrite_removes_stale_partitions(self):
+        write_partitioned_books(self.books, self.root)
+        # Row 3's missing checkout date gets fixed, so the default partition empties
+        fixed = self.books.copy()
+        fixed.loc[2, "checkout_date"] = pd.Timestamp("2023-03-01")
+        write_partitioned_books(fixed, self.root)
+
+        self.assertEqual(len(list_partitions(self.root)), 2)
+        df = read_partitioned_books(self.root)
+        self.assertEqual(sorted(df["id"]), ["1", "2", "3"])
+
+    def test_partial_update_keeps_other_months(self):
+        write_partitioned_books(self.books, self.root)
+        update = self.books.iloc[[1]].assign(book_title="It")
+        written = write_partitioned_books(update, self.root, prune=False)
+
+        self.assertEqual(len(written), 1)
+        self.assertEqual(len(read_partitioned_books(self.root)), 3)
+
+
+if __name__ =='__main__':
+    unittest.main()
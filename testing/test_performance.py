@@ -0,0 +1,145 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ROOT)
+from checkpoint import clear_checkpoints, load_and_clean_books_resumable
+from cleaning_script import process_library_data
+from date_parsing import DateCache
+from generated_exports import write_books_export, write_customers_export
+import metrics
+from metrics import load_and_clean_books, load_and_clean_customers
+
+# Stored budgets; refresh with UPDATE_PERF_BASELINES=1 python -m pytest test_performance.py
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baselines.json")
+UPDATE_BASELINES = os.environ.get("UPDATE_PERF_BASELINES") == "1"
+# Budgets are scaled to this machine's speed, so they run by default; opt out on a busy box
+SKIP_PERF_TESTS = os.environ.get("SKIP_PERF_TESTS") == "1" and not UPDATE_BASELINES
+
+# Allowed slowdown / growth over the stored baseline before a test fails
+TIME_TOLERANCE = float(os.environ.get("PERF_TIME_TOLERANCE", "2.0"))
+MEMORY_TOLERANCE = float(os.environ.get("PERF_MEMORY_TOLERANCE", "1.5"))
+# Extra seconds on top, so scheduler noise cannot fail the very fast functions
+TIME_SLACK = float(os.environ.get("PERF_TIME_SLACK", "0.05"))
+
+def calibrate(repeat=5):
+    """Best-of-n seconds for a fixed pandas workload, as a yardstick for this machine's speed."""
+    rng = np.random.default_rng(0)
+    days = pd.Series(rng.integers(1, 29, 50000)).astype(str).str.zfill(2)
+    titles = pd.Series(rng.choice([" the hobbit", "Dune ", "little women"], 50000))
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        dates = pd.to_datetime(days + "/03/2023", format="%d/%m/%Y")
+        titles.str.strip().str.title().groupby(dates).size()
+        best = min(best, time.perf_counter() - started)
+    return round(best, 4)
+
+
+def clean_books_resumable(file_path, work_dir):
+    # Start from scratch each time; a finished work dir would only be read back
+    clear_checkpoints(work_dir)
+    return load_and_clean_books_resumable(file_path, work_dir, chunksize=5000)
+
+
+def measure(func, *args, repeat=3):
+    """Best-of-n wall time, then peak traced memory from one more run."""
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            # A warm date cache would hide a slowdown in date parsing
+            with mock.patch.object(metrics, "DATE_CACHE", DateCache()):
+                started = time.perf_counter()
+                func(*args)
+                best = min(best, time.perf_counter() - started)
+
+        tracemalloc.start()
+        try:
+            with mock.patch.object(metrics, "DATE_CACHE", DateCache()):
+                func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {"seconds": round(best, 4), "peak_mb": round(peak / 1e6, 2)}
+
+
+@unittest.skipIf(SKIP_PERF_TESTS, "performance budgets skipped with SKIP_PERF_TESTS=1")
+class TestPerformance(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.books_file = os.path.join(cls.tmp.name, "books.csv")
+        cls.customers_file = os.path.join(cls.tmp.name, "customers.csv")
+        cls.work_dir = os.path.join(cls.tmp.name, "work", "books")
+        write_books_export(cls.books_file)
+        write_customers_export(cls.customers_file)
+
+        cls.baselines = {}
+        if os.path.exists(BASELINES_FILE):
+            with open(BASELINES_FILE) as f:
+                cls.baselines = json.load(f)
+
+        cls.calibration = calibrate()
+        if UPDATE_BASELINES:
+            cls.baselines["calibration_seconds"] = cls.calibration
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+        if UPDATE_BASELINES:
+            with open(BASELINES_FILE, "w") as f:
+                json.dump(cls.baselines, f, indent=2, sort_keys=True)
+                f.write("\n")
+
+    def check_budget(self, name, func, *args):
+        result = measure(func, *args)
+
+        if UPDATE_BASELINES:
+            self.baselines[name] = result
+            return
+
+        baseline = self.baselines.get(name)
+        if baseline is None:
+            self.skipTest(f"No baseline for {name}; run with UPDATE_PERF_BASELINES=1")
+
+        # Scale the stored time by how fast this machine runs the calibration workload
+        speed = self.calibration / self.baselines["calibration_seconds"]
+        time_budget = baseline["seconds"] * speed * TIME_TOLERANCE + TIME_SLACK
+        memory_budget = baseline["peak_mb"] * MEMORY_TOLERANCE
+        self.assertLessEqual(
+            result["seconds"], time_budget,
+            f"{name} took {result['seconds']}s, budget {time_budget:.4f}s "
+            f"(baseline {baseline['seconds']}s, machine speed factor {speed:.2f})",
+        )
+        self.assertLessEqual(
+            result["peak_mb"], memory_budget,
+            f"{name} peaked at {result['peak_mb']}MB, budget {memory_budget:.2f}MB (baseline {baseline['peak_mb']}MB)",
+        )
+
+    def test_load_and_clean_books(self):
+        self.check_budget("load_and_clean_books", load_and_clean_books, self.books_file)
+
+    def test_load_and_clean_books_resumable(self):
+        self.check_budget("load_and_clean_books_resumable", clean_books_resumable, self.books_file, self.work_dir)
+
+    def test_process_library_data(self):
+        self.check_budget("process_library_data", process_library_data, self.books_file)
+
+    def test_load_and_clean_customers(self):
+        self.check_budget("load_and_clean_customers", load_and_clean_customers, self.customers_file)
+
+
+if __name__ =='__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ROOT)
+import pandas as pd
+import preview
+from generated_exports import write_books_export
+from metrics import BOOK_COLUMNS, clean_book_rows, load_and_clean_books, summarise_books
+from preview import preview_books
+
+SEEDS = range(20)
+ROW_METRICS = ["rows_loaded", "blank_rows_removed", "duplicate_rows_removed", "rows_after_cleaning"]
+# Scaled by the cleaned row count, so they still include duplicates without the exact scan
+COUNT_METRICS = [
+    "missing_customer_ids", "invalid_checkout_dates", "invalid_return_dates",
+    "books_due_over_2_weeks", "on_time_returns", "overdue_returns",
+]
+
+class TestPreview(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.books_file = os.path.join(cls.tmp.name, "books.csv")
+        write_books_export(cls.books_file, rows=60000, seed=36)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, cls.truth = load_and_clean_books(cls.books_file)
+            # The same metrics with the duplicate rows left in
+            raw = pd.read_csv(cls.books_file).dropna(how="all").rename(columns=BOOK_COLUMNS)
+            _, cls.truth_with_duplicates = summarise_books(clean_book_rows(raw.reset_index(drop=True)), 0, 0, 0)
+
+        cls.gz_file = os.path.join(cls.tmp.name, "books.csv.gz")
+        with open(cls.books_file, "rb") as src, gzip.open(cls.gz_file, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def missed_seeds(self, file_path, exact_counts=False):
+        truth = dict(self.truth)
+        if not exact_counts:
+            truth.update({metric: self.truth_with_duplicates[metric] for metric in COUNT_METRICS})
+
+        missed = {}
+        for seed in SEEDS:
+            result = preview_books(file_path, sample_rows=5000, seed=seed, exact_counts=exact_counts)
+            for row in result.itertuples():
+                if row.reliability == "not_estimated":
+                    continue
+                if not exact_counts and row.metric in COUNT_METRICS:
+                    self.assertEqual(row.reliability, "rough")
+                if not row.ci_low - 1e-9 <= truth[row.metric] <= row.ci_high + 1e-9:
+                    missed.setdefault(row.metric, []).append(seed)
+        return missed
+
+    def assert_covered(self, missed):
+        # 95% intervals: allow a few misses over the seeds, not a systematic one
+        for metric, seeds in missed.items():
+            self.assertLessEqual(len(seeds), 3, f"{metric} missed for seeds {seeds}")
+
+    def test_intervals_cover_actual_metrics(self):
+        self.assert_covered(self.missed_seeds(self.books_file))
+
+    def test_intervals_cover_actual_metrics_with_exact_counts(self):
+        self.assert_covered(self.missed_seeds(self.books_file, exact_counts=True))
+
+    def test_default_preview_does_not_scan_the_file(self):
+        with mock.patch.object(preview, "_scan_lines", side_effect=AssertionError("full scan")):
+            result = preview_books(self.books_file, sample_rows=5000).set_index("metric")
+
+        self.assertEqual(result.loc["duplicate_rows_removed", "reliability"], "not_estimated")
+        self.assertEqual(result.loc["rows_after_cleaning", "reliability"], "not_estimated")
+        self.assertEqual(result.loc["rows_loaded", "reliability"], "sampled")
+        self.assertEqual(result.loc["overlapping_loans", "reliability"], "not_estimated")
+
+    def test_exact_counts(self):
+        result = preview_books(self.books_file, sample_rows=5000, exact_counts=True).set_index("metric")
+        for metric in ROW_METRICS:
+            self.assertEqual(result.loc[metric, "estimate"], self.truth[metric])
+            self.assertEqual(result.loc[metric, "reliability"], "exact")
+        self.assertGreater(self.truth["duplicate_rows_removed"], 0)
+        self.assertEqual(result.loc["avg_borrowed_days", "reliability"], "sampled")
+
+    def test_compressed_input_falls_back_to_reservoir(self):
+        result = preview_books(self.gz_file, sample_rows=5000).set_index("metric")
+        self.assertTrue((result["method"] == "reservoir").all())
+        # Every line goes past on the way through the stream, so the row count is exact
+        self.assertEqual(result.loc["rows_loaded", "estimate"], self.truth["rows_loaded"])
+        self.assertEqual(result.loc["rows_loaded", "reliability"], "exact")
+        self.assert_covered(self.missed_seeds(self.gz_file))
+
+        exact = preview_books(self.gz_file, sample_rows=5000, exact_counts=True).set_index("metric")
+        for metric in ROW_METRICS:
+            self.assertEqual(exact.loc[metric, "estimate"], self.truth[metric])
+
+    def test_small_file_read_whole(self):
+        result = preview_books(os.path.join(ROOT, "03_Library Systembook.csv")).set_index("metric")
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, truth = load_and_clean_books(os.path.join(ROOT, "03_Library Systembook.csv"))
+        for metric in ROW_METRICS + ["invalid_checkout_dates", "overdue_returns"]:
+            self.assertEqual(result.loc[metric, "estimate"], truth[metric])
+            self.assertEqual(result.loc[metric, "reliability"], "exact")
+
+
+if __name__ =='__main__':
+    unittest.main()
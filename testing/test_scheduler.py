@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from scheduler import Stage, critical_path, run_pipeline
+
+class TestScheduler(unittest.TestCase):
+    def test_independent_stages_overlap(self):
+        # Both stages must be running at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def clean(value):
+            barrier.wait()
+            return value * 2
+
+        stages = [
+            Stage("books", clean, inputs=["a"], outputs=["books"]),
+            Stage("customers", clean, inputs=["b"], outputs=["customers"]),
+            Stage("report", lambda x, y: x + y, inputs=["books", "customers"], outputs=["total"]),
+        ]
+        values, timings = run_pipeline(stages, initial={"a": 1, "b": 2})
+
+        self.assertEqual(values["total"], 6)
+        self.assertGreaterEqual(timings["report"]["start"], timings["books"]["end"])
+
+    def test_stage_output_not_interleaved(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def report(name):
+            print(f"--- {name} ---")
+            # Both stages are mid-report at the same time
+            barrier.wait()
+            print(f"{name} rows: 1")
+            return name
+
+        stages = [
+            Stage("books", report, inputs=["a"], outputs=["books"]),
+            Stage("customers", report, inputs=["b"], outputs=["customers"]),
+        ]
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            run_pipeline(stages, initial={"a": "books", "b": "customers"})
+
+        lines = out.getvalue().splitlines()
+        for name in ["books", "customers"]:
+            start = lines.index(f"--- {name} ---")
+            self.assertEqual(lines[start + 1], f"{name} rows: 1")
+
+    def test_critical_path(self):
+        stages = [
+            Stage("a", None, outputs=["x"]),
+            Stage("b", None, outputs=["y"]),
+            Stage("c", None, inputs=["x", "y"]),
+        ]
+        timings = {"a": {"seconds": 1.0}, "b": {"seconds": 3.0}, "c": {"seconds": 2.0}}
+        path, seconds = critical_path(stages, timings)
+        self.assertEqual(path, ["b", "c"])
+        self.assertEqual(seconds, 5.0)
+
+    def test_cycle_rejected(self):
+        stages = [
+            Stage("a", None, inputs=["y"], outputs=["x"]),
+            Stage("b", None, inputs=["x"], outputs=["y"]),
+        ]
+        with self.assertRaises(ValueError):
+            run_pipeline(stages)
+
+
+if __name__ =='__main__':
+    unittest.main()
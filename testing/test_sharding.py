@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ROOT)
+from generated_exports import write_books_export, write_customers_export
+from metrics import load_and_clean_books, load_and_clean_customers
+from sharding import load_raw_exports, sharded_join
+
+class TestShardedJoin(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.books_file = os.path.join(self.tmp.name, "books.csv")
+        self.customers_file = os.path.join(self.tmp.name, "customers.csv")
+        write_books_export(self.books_file, rows=2000, seed=31)
+        write_customers_export(self.customers_file, rows=500, seed=31)
+        # Repeat some customers so their duplicates have to be found inside a shard
+        customers = pd.read_csv(self.customers_file, dtype="string")
+        pd.concat([customers, customers.iloc[:20]]).to_csv(self.customers_file, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_single_process_dedupe_and_merge(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            books, books_metrics = load_and_clean_books(self.books_file)
+            customers, customers_metrics = load_and_clean_customers(self.customers_file)
+        expected = books.merge(customers, on="customer_id", how="left")
+
+        shard_dir = os.path.join(self.tmp.name, "shards")
+        raw_books, raw_customers = load_raw_exports(self.books_file, self.customers_file)
+        joined, counts = sharded_join(raw_books, raw_customers, shards=3, shard_dir=shard_dir, workers=2)
+
+        pd.testing.assert_frame_equal(joined, expected)
+        self.assertEqual(counts["books_duplicate_rows_removed"], books_metrics["duplicate_rows_removed"])
+        self.assertEqual(counts["books_blank_rows_removed"], books_metrics["blank_rows_removed"])
+        self.assertEqual(counts["customers_duplicate_rows_removed"], customers_metrics["duplicate_rows_removed"])
+        self.assertGreater(counts["customers_duplicate_rows_removed"], 0)
+        # Shard files are gone once the join is done
+        self.assertEqual(os.listdir(shard_dir), [])
+
+    def test_shards_parse_dates_in_the_export_format(self):
+        # Only customer 1's shard starts with a valid date; the other shards start with an invalid one
+        lines = ["Id,Books,Book checkout,Book Returned,Days allowed to borrow,Customer ID"]
+        lines.append("1,Dune,20/02/2023,25/02/2023,2 weeks,1")
+        for customer in range(1, 9):
+            lines.append(f"{customer}1,Dune,32/05/2023,2023-06-01,2 weeks,{customer}")
+            lines.append(f"{customer}2,Emma,2023-06-01,05/06/2023,2 weeks,{customer}")
+        with open(self.books_file, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            books, books_metrics = load_and_clean_books(self.books_file)
+        raw_books, raw_customers = load_raw_exports(self.books_file, self.customers_file)
+        joined, _ = sharded_join(raw_books, raw_customers, shards=4, workers=2)
+
+        self.assertEqual(joined["checkout_date"].isna().sum(), books_metrics["invalid_checkout_dates"])
+        pd.testing.assert_series_equal(joined["return_date"], books["return_date"])
+
+
+if __name__ =='__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from timeseries import daily_loan_series
+
+def loans(*rows):
+    return pd.DataFrame(rows, columns=["checkout_date", "return_date", "time_allowed_to_borrow"]).assign(
+        checkout_date=lambda df: pd.to_datetime(df["checkout_date"]),
+        return_date=lambda df: pd.to_datetime(df["return_date"]),
+    )
+
+class TestDailyLoanSeries(unittest.TestCase):
+    def day(self, series, date):
+        return series.set_index("date").loc[pd.Timestamp(date)]
+
+    def test_same_day_return(self):
+        series = daily_loan_series(loans(("2023-01-01", "2023-01-01", "2 weeks")))
+        self.assertEqual(len(series), 1)
+        row = self.day(series, "2023-01-01")
+        self.assertEqual(list(row), [0, 0, 1, 1])
+
+    def test_overdue_boundary(self):
+        # 14 days allowed: out on the 15th is fine, out at the end of the 16th is overdue
+        series = daily_loan_series(loans(
+            ("2023-01-01", "2023-01-15", "2 weeks"),
+            ("2023-01-01", "2023-01-17", "2 weeks"),
+        ))
+        self.assertEqual(self.day(series, "2023-01-15")["loans_overdue"], 0)
+        self.assertEqual(self.day(series, "2023-01-16")["loans_overdue"], 1)
+        self.assertEqual(self.day(series, "2023-01-17")["loans_overdue"], 0)
+        self.assertEqual(self.day(series, "2023-01-16")["loans_outstanding"], 1)
+
+    def test_open_loan_stays_out_to_end_of_range(self):
+        series = daily_loan_series(loans(("2023-01-01", None, "10 days")), end="2023-01-31")
+        self.assertEqual(series["date"].iloc[-1], pd.Timestamp("2023-01-31"))
+        self.assertTrue((series["loans_outstanding"] == 1).all())
+        self.assertEqual(self.day(series, "2023-01-11")["loans_overdue"], 0)
+        self.assertEqual(self.day(series, "2023-01-12")["loans_overdue"], 1)
+        self.assertEqual(series["loans_overdue"].iloc[-1], 1)
+
+    def test_start_after_some_events(self):
+        series = daily_loan_series(loans(
+            ("2023-01-01", "2023-01-03", "2 weeks"),
+            ("2023-01-02", "2023-01-20", "2 weeks"),
+            ("2023-01-05", "2023-01-06", "2 weeks"),
+        ), start="2023-01-04")
+
+        first = self.day(series, "2023-01-04")
+        # Loans already out carry over, but their earlier checkouts/returns do not
+        self.assertEqual(list(first), [1, 0, 0, 0])
+        self.assertEqual(list(self.day(series, "2023-01-05")), [2, 0, 1, 0])
+        self.assertEqual(self.day(series, "2023-01-17")["loans_overdue"], 1)
+        self.assertEqual(series["checkouts"].sum(), 1)
+
+
+if __name__ =='__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import pandas as pd
+
+# Same allowance the overdue metrics assume when the export leaves it blank
+DEFAULT_ALLOWANCE_DAYS = 14
+
+UNIT_DAYS = {"day": 1, "week": 7, "month": 30}
+
+
+def allowance_days(allowance: pd.Series) -> pd.Series:
+    """Turn time_allowed_to_borrow text such as "2 weeks" or "10 days" into days."""
+    parts = allowance.astype("string").str.strip().str.lower().str.extract(
+        r"^(?P<amount>\d+(?:\.\d+)?)\s*(?P<unit>day|week|month)?"
+    )
+    amount = pd.to_numeric(parts["amount"], errors="coerce")
+    unit = parts["unit"].map(UNIT_DAYS).fillna(1)
+    return (amount * unit).fillna(DEFAULT_ALLOWANCE_DAYS)
+
+
+def daily_loan_series(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Loans out and loans overdue at the end of every day, from one event sweep.
+
+    Each loan adds +1 on its checkout day and -1 on its return day. It also
+    adds +1 overdue on the day after its allowance runs out and -1 when it comes
+    back. Sorting the events by day and taking a running sum gives both series
+    in O(n log n), however many days the range covers. Loans with no return
+    date stay out, and become overdue, until the end of the range. Loans with
+    no checkout date, or returned before checkout, are skipped.
+    """
+    checkout = pd.to_datetime(df["checkout_date"]).dt.normalize()
+    returned = pd.to_datetime(df["return_date"]).dt.normalize()
+    valid = checkout.notna() & (returned.isna() | (returned >= checkout))
+
+    columns = ["date", "loans_outstanding", "loans_overdue", "checkouts", "returns"]
+    if not valid.any():
+        return pd.DataFrame(columns=columns)
+
+    checkout = checkout[valid]
+    returned = returned[valid]
+    overdue_from = checkout + pd.to_timedelta(allowance_days(df.loc[valid, "time_allowed_to_borrow"]) + 1, unit="D")
+    becomes_overdue = returned.isna() | (returned > overdue_from)
+
+    events = pd.concat([
+        pd.DataFrame({"date": checkout, "outstanding": 1, "overdue": 0, "checkouts": 1, "returns": 0}),
+        pd.DataFrame({"date": returned.dropna(), "outstanding": -1, "overdue": 0, "checkouts": 0, "returns": 1}),
+        pd.DataFrame({"date": overdue_from[becomes_overdue], "outstanding": 0, "overdue": 1, "checkouts": 0, "returns": 0}),
+        pd.DataFrame({"date": returned[becomes_overdue].dropna(), "outstanding": 0, "overdue": -1, "checkouts": 0, "returns": 0}),
+    ], ignore_index=True)
+
+    start = pd.Timestamp(start).normalize() if start is not None else checkout.min()
+    end = pd.Timestamp(end).normalize() if end is not None else pd.concat([checkout, returned]).max()
+    days = pd.date_range(start, end, freq="D", name="date")
+    if len(days) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Events before the range still set the level on its first day
+    before = events["date"] < start
+    events.loc[before, ["date", "checkouts", "returns"]] = [start, 0, 0]
+
+    daily = events.groupby("date").sum().reindex(days, fill_value=0)
+    series = pd.DataFrame({
+        "date": days,
+        "loans_outstanding": daily["outstanding"].cumsum().to_numpy(),
+        "loans_overdue": daily["overdue"].cumsum().to_numpy(),
+        "checkouts": daily["checkouts"].to_numpy(),
+        "returns": daily["returns"].to_numpy(),
+    })
+    return series
+
+
+def write_daily_loan_series(df: pd.DataFrame, path: str = "loan_daily_series.csv") -> pd.DataFrame:
+    series = daily_loan_series(df)
+    series.to_csv(path, index=False, date_format="%Y-%m-%d")
+    return series